@@ -0,0 +1,138 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from ps1 import State
+
+
+def load_ec_table(filename):
+    """
+    Reads EC votes per state from a tab-delimited file with a header line,
+    State   EC_votes
+
+    Parameters:
+    filename - the name of the data file as a string
+
+    Returns:
+    a dictionary, state name -> number of EC votes
+    """
+
+    ec_votes = {}
+    with open(filename) as file:
+        file.readline()
+        for line in file:
+            if line.strip():
+                name, ec = line.rstrip("\n").split("\t")[:2]
+                ec_votes[name] = int(ec)
+    return ec_votes
+
+
+def _aggregate_range(filename, start, end, columns, delimiter, header, chunk_size):
+    """
+    Sums dem and gop votes per state for the lines that start in [start, end)
+    of the file, reading chunk_size bytes at a time.
+
+    Returns:
+    a dictionary, state name -> [dem, gop], in order of first appearance
+    """
+
+    state_column, dem_column, gop_column = columns
+    delimiter = delimiter.encode()
+    totals = {}
+
+    with open(filename, "rb") as file:
+        file.seek(start)
+
+        # A line cut by the range start belongs to the previous range
+        if start > 0:
+            file.seek(start - 1)
+            if file.read(1) != b"\n":
+                file.readline()
+        elif header:
+            file.readline()
+
+        position = file.tell()
+        rest = b""
+        while position < end:
+            chunk = file.read(chunk_size)
+            if not chunk:
+                break
+            lines = (rest + chunk).split(b"\n")
+            rest = lines.pop()
+
+            for line in lines:
+
+                # Stop at the first line that starts in the next range
+                if position >= end:
+                    break
+                position += len(line) + 1
+                _add_line(totals, line, state_column, dem_column, gop_column, delimiter)
+
+        # Last line of the file without a trailing newline
+        if rest and position < end:
+            _add_line(totals, rest, state_column, dem_column, gop_column, delimiter)
+
+    return totals
+
+
+def _add_line(totals, line, state_column, dem_column, gop_column, delimiter):
+    line = line.rstrip(b"\r")
+    if not line:
+        return
+    fields = line.split(delimiter)
+    name = fields[state_column].decode()
+    if name not in totals:
+        totals[name] = [0, 0]
+    totals[name][0] += int(fields[dem_column])
+    totals[name][1] += int(fields[gop_column])
+
+
+def aggregate_results(filename, ec_votes, state_column=0, dem_column=1, gop_column=2,
+                      delimiter="\t", header=True, chunk_size=1 << 22, workers=1):
+    """
+    Aggregates a precinct or county level results file into the list of State
+    instances the rest of ps1 expects. The file is streamed in chunks and only
+    one running (dem, gop) total per state is kept, so memory does not grow
+    with the number of rows.
+
+    Parameters:
+    filename - the name of the data file as a string, one precinct or county per line
+    ec_votes - a dictionary, state name -> number of EC votes (or the filename of
+               an EC table, see load_ec_table)
+    state_column, dem_column, gop_column - int, column of the state name and of the vote counts
+    delimiter - str, the column separator
+    header - bool, True if the first line is a header
+    chunk_size - int, number of bytes read at a time
+    workers - int, number of processes; the file is split into that many byte ranges
+
+    Returns:
+    a list of State instances, one per state in order of first appearance
+    """
+
+    if isinstance(ec_votes, str):
+        ec_votes = load_ec_table(ec_votes)
+
+    columns = (state_column, dem_column, gop_column)
+    size = os.path.getsize(filename)
+    if workers <= 1:
+        parts = [_aggregate_range(filename, 0, size, columns, delimiter, header, chunk_size)]
+    else:
+        bounds = [size * i // workers for i in range(workers + 1)]
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            parts = list(executor.map(_aggregate_range, [filename] * workers, bounds[:-1], bounds[1:],
+                                      [columns] * workers, [delimiter] * workers,
+                                      [header] * workers, [chunk_size] * workers))
+
+    # Merge the per-range totals, keeping first-appearance order
+    totals = {}
+    for part in parts:
+        for name, (dem, gop) in part.items():
+            if name not in totals:
+                totals[name] = [0, 0]
+            totals[name][0] += dem
+            totals[name][1] += gop
+
+    missing = [name for name in totals if name not in ec_votes]
+    if missing:
+        raise ValueError("no EC votes for: %s" % ", ".join(missing))
+
+    return [State(name, dem, gop, ec_votes[name]) for name, (dem, gop) in totals.items()]
@@ -0,0 +1,166 @@
+import bisect
+import heapq
+
+from instrument import instrumented
+
+
+@instrumented
+def allocate_in_order(capacities, demands):
+    """
+    Fills each demand in turn from the donors in turn (two pointers, O(n + m)).
+
+    Parameters:
+    capacities - a list of ints, voters each donor can give up
+    demands - a list of ints, voters each receiver needs
+
+    Returns:
+    A dictionary with the following (key, value) mapping:
+        - Key: a 2 element tuple, (donor_index, receiver_index)
+        - Value: int, number of voters moved
+    None, if the donors cannot cover every demand
+    """
+
+    if sum(capacities) < sum(demands):
+        return None
+
+    moves = {}
+    donor = 0
+    left = capacities[0] if capacities else 0
+    for receiver, need in enumerate(demands):
+        while need > 0:
+
+            # Skip exhausted donors
+            while left == 0:
+                donor += 1
+                left = capacities[donor]
+
+            amount = min(left, need)
+            moves[(donor, receiver)] = amount
+            left -= amount
+            need -= amount
+    return moves
+
+
+@instrumented
+def allocate_min_moves(capacities, demands):
+    """
+    Fills the demands using few distinct (donor, receiver) pairs. Largest
+    demands go first; each is served by the smallest donor that can cover it
+    alone, otherwise by the largest donors. Minimizing the number of pairs
+    exactly is NP-hard; here every pair either uses up a donor or completes
+    a receiver, so there are at most n + m of them.
+
+    Parameters:
+    capacities - a list of ints, voters each donor can give up
+    demands - a list of ints, voters each receiver needs
+
+    Returns:
+    the same mapping as allocate_in_order, or None if the donors cannot cover every demand
+    """
+
+    if sum(capacities) < sum(demands):
+        return None
+
+    # Remaining donor capacities, kept sorted for best-fit lookups
+    pool = sorted((left, donor) for donor, left in enumerate(capacities) if left > 0)
+    moves = {}
+    for receiver in sorted(range(len(demands)), key=lambda r: -demands[r]):
+        need = demands[receiver]
+        while need > 0:
+            fit = bisect.bisect_left(pool, (need, -1))
+            if fit == len(pool):
+                fit -= 1
+            left, donor = pool.pop(fit)
+
+            amount = min(left, need)
+            moves[(donor, receiver)] = amount
+            need -= amount
+            if left > amount:
+                bisect.insort(pool, (left - amount, donor))
+    return moves
+
+
+@instrumented
+def allocate_min_cost(capacities, demands, cost):
+    """
+    Fills the demands at minimum total cost, where moving one voter from donor
+    i to receiver j costs cost(i, j). Solved as a min-cost flow with successive
+    shortest paths (Dijkstra with potentials).
+
+    Parameters:
+    capacities - a list of ints, voters each donor can give up
+    demands - a list of ints, voters each receiver needs
+    cost - function (donor_index, receiver_index) -> non-negative number
+
+    Returns:
+    the same mapping as allocate_in_order, or None if the donors cannot cover every demand
+    """
+
+    if sum(capacities) < sum(demands):
+        return None
+
+    n, m = len(capacities), len(demands)
+    source, sink = n + m, n + m + 1
+    graph = [[] for _ in range(n + m + 2)]
+
+    # Edges are [to, residual capacity, cost, index of reverse edge]
+    def add_edge(frm, to, capacity, weight):
+        graph[frm].append([to, capacity, weight, len(graph[to])])
+        graph[to].append([frm, 0, -weight, len(graph[frm]) - 1])
+
+    unbounded = sum(demands)
+    for donor in range(n):
+        if capacities[donor] > 0:
+            add_edge(source, donor, capacities[donor], 0)
+            for receiver in range(m):
+                add_edge(donor, n + receiver, unbounded, cost(donor, receiver))
+    for receiver in range(m):
+        add_edge(n + receiver, sink, demands[receiver], 0)
+
+    potential = [0] * len(graph)
+    remaining = unbounded
+    while remaining > 0:
+
+        # Shortest path on reduced costs
+        dist = [None] * len(graph)
+        parent = [None] * len(graph)
+        dist[source] = 0
+        heap = [(0, source)]
+        while heap:
+            d, node = heapq.heappop(heap)
+            if d > dist[node]:
+                continue
+            for k, (to, capacity, weight, _) in enumerate(graph[node]):
+                reduced = d + weight + potential[node] - potential[to]
+                if capacity > 0 and (dist[to] is None or reduced < dist[to]):
+                    dist[to] = reduced
+                    parent[to] = (node, k)
+                    heapq.heappush(heap, (reduced, to))
+
+        for node in range(len(graph)):
+            if dist[node] is not None:
+                potential[node] += dist[node]
+
+        # Push the bottleneck amount along the path
+        amount = remaining
+        node = sink
+        while node != source:
+            frm, k = parent[node]
+            amount = min(amount, graph[frm][k][1])
+            node = frm
+        node = sink
+        while node != source:
+            frm, k = parent[node]
+            edge = graph[frm][k]
+            edge[1] -= amount
+            graph[node][edge[3]][1] += amount
+            node = frm
+        remaining -= amount
+
+    # Flow on a donor -> receiver edge is the residual capacity of its reverse edge
+    moves = {}
+    for donor in range(n):
+        for to, capacity, weight, reverse in graph[donor]:
+            if n <= to < n + m and graph[to][reverse][1] > 0:
+                moves[(donor, to - n)] = graph[to][reverse][1]
+    return moves
@@ -0,0 +1,218 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import shared_memory
+
+from ps1 import State, find_winner, winner_states, ec_votes_reqd, greedy_election, move_min_voters, flip_election
+
+
+def analyze_election(election, total=538):
+    """
+    Runs the full analysis chain on one election:
+    find_winner -> greedy_election -> move_min_voters -> flip_election
+
+    Parameters:
+    election - a list of State instances
+    total - total possible number of EC votes
+
+    Returns:
+    A dictionary with the following (key, value) mapping:
+        - "winner", "loser": str, "dem" or "gop"
+        - "ec_votes_needed": int, additional EC votes the loser needs
+        - "greedy_states", "optimal_states": lists of state names
+        - "greedy_voters", "optimal_voters": int, voters displaced (margin + 1 per state)
+        - "flip": the result of flip_election on the optimal swing states
+    """
+
+    winner, loser = find_winner(election)
+    won_states = winner_states(election)
+    ec_votes_needed = ec_votes_reqd(election, total)
+    greedy_swing = greedy_election(won_states, ec_votes_needed)
+    optimal_swing = move_min_voters(won_states, ec_votes_needed)
+
+    return {
+        "winner": winner,
+        "loser": loser,
+        "ec_votes_needed": ec_votes_needed,
+        "greedy_states": [state.get_name() for state in greedy_swing],
+        "greedy_voters": sum(state.get_margin() + 1 for state in greedy_swing),
+        "optimal_states": [state.get_name() for state in optimal_swing],
+        "optimal_voters": sum(state.get_margin() + 1 for state in optimal_swing),
+        "flip": flip_election(election, optimal_swing, total=total),
+    }
+
+
+def _apply_scenario(names, dem, gop, ec, scenario):
+    """
+    Builds the election for one scenario from the base columns.
+
+    Parameters:
+    names - list of str, the state names
+    dem, gop, ec - indexable int columns of the base election
+    scenario - dict, state name -> (dem_delta, gop_delta) vote changes
+
+    Returns:
+    a list of State instances
+    """
+
+    election = []
+    for i, name in enumerate(names):
+        dem_delta, gop_delta = scenario.get(name, (0, 0))
+        election.append(State(name, dem[i] + dem_delta, gop[i] + gop_delta, ec[i]))
+    return election
+
+
+# Per-worker view of the shared base election, set up by _init_worker
+_worker_base = None
+
+
+def _init_worker(shm_name, names, total):
+    """
+    Attaches a worker process to the shared base election (once per worker).
+    """
+
+    global _worker_base
+    shm = shared_memory.SharedMemory(name=shm_name)
+    columns = shm.buf.cast("q")
+    n = len(names)
+    _worker_base = (shm, columns, names, columns[:n], columns[n:2 * n], columns[2 * n:3 * n], total)
+
+
+def _run_chunk(task):
+    """
+    Analyzes a chunk of scenarios inside a worker process.
+
+    Parameters:
+    task - a tuple (start, scenarios)
+
+    Returns:
+    a tuple (start, list of analysis results)
+    """
+
+    start, scenarios = task
+    shm, columns, names, dem, gop, ec, total = _worker_base
+    return start, [analyze_election(_apply_scenario(names, dem, gop, ec, scenario), total)
+                   for scenario in scenarios]
+
+
+class SharedElection():
+    """
+    The dem, gop and ec columns of an election placed once in shared memory,
+    so worker processes can read them without unpickling the state list.
+    Use as a context manager; the block is released on exit.
+    """
+    def __init__(self, election):
+        """
+        Parameters:
+        election - a list of State instances
+
+        Attributes:
+        self.names - list of str, the state names
+        self.shm - the SharedMemory block holding dem, gop and ec as int64 columns
+        """
+
+        self.names = [state.get_name() for state in election]
+        n = len(election)
+        self.shm = shared_memory.SharedMemory(create=True, size=max(24 * n, 8))
+        columns = self.shm.buf.cast("q")
+        for i, state in enumerate(election):
+            columns[i] = state.dem
+            columns[n + i] = state.gop
+            columns[2 * n + i] = state.get_num_ecvotes()
+        columns.release()
+
+    def close(self):
+        self.shm.close()
+        self.shm.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def run_scenarios(election, scenarios, workers=None, ordered=True, chunksize=16, total=538):
+    """
+    Runs analyze_election on many modified versions of election across a process pool.
+
+    Parameters:
+    election - a list of State instances, the base election
+    scenarios - iterable of dicts, state name -> (dem_delta, gop_delta) vote changes
+    workers - int, number of worker processes (defaults to os.cpu_count())
+    ordered - bool, if True results are yielded in scenario order, otherwise as they complete
+    chunksize - int, number of scenarios sent to a worker per task
+    total - total possible number of EC votes
+
+    Returns:
+    A generator of (index, result) tuples, where result is the output of analyze_election
+    """
+
+    scenarios = list(scenarios)
+    tasks = [(start, scenarios[start:start + chunksize]) for start in range(0, len(scenarios), chunksize)]
+
+    with SharedElection(election) as shared:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(shared.shm.name, shared.names, total)) as executor:
+            if ordered:
+                chunks = executor.map(_run_chunk, tasks)
+            else:
+                chunks = (future.result() for future in
+                          as_completed([executor.submit(_run_chunk, task) for task in tasks]))
+
+            for start, results in chunks:
+                for offset, result in enumerate(results):
+                    yield start + offset, result
+
+
+def run_scenarios_serial(election, scenarios, total=538):
+    """
+    Serial reference path for run_scenarios, on the calling process.
+
+    Returns:
+    A generator of (index, result) tuples, in scenario order
+    """
+
+    names = [state.get_name() for state in election]
+    dem = [state.dem for state in election]
+    gop = [state.gop for state in election]
+    ec = [state.get_num_ecvotes() for state in election]
+    for index, scenario in enumerate(scenarios):
+        yield index, analyze_election(_apply_scenario(names, dem, gop, ec, scenario), total)
+
+
+def compare_throughput(election, scenarios, workers=None, chunksize=16, total=538):
+    """
+    Times the serial and the process pool paths on the same scenarios.
+
+    Returns:
+    A dictionary with the following (key, value) mapping:
+        - "scenarios": int, number of scenarios run
+        - "workers": int, number of worker processes
+        - "serial_seconds", "parallel_seconds": float, wall time of each path
+        - "serial_throughput", "parallel_throughput": float, scenarios per second
+        - "speedup": float, serial time divided by parallel time
+    """
+
+    scenarios = list(scenarios)
+    workers = workers or os.cpu_count()
+
+    start = time.perf_counter()
+    for _ in run_scenarios_serial(election, scenarios, total):
+        pass
+    serial = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in run_scenarios(election, scenarios, workers, ordered=False, chunksize=chunksize, total=total):
+        pass
+    parallel = time.perf_counter() - start
+
+    return {
+        "scenarios": len(scenarios),
+        "workers": workers,
+        "serial_seconds": serial,
+        "parallel_seconds": parallel,
+        "serial_throughput": len(scenarios) / serial if serial else float("inf"),
+        "parallel_throughput": len(scenarios) / parallel if parallel else float("inf"),
+        "speedup": serial / parallel if parallel else float("inf"),
+    }
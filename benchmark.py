@@ -0,0 +1,181 @@
+import argparse
+import json
+import os
+import platform
+import random
+import tempfile
+import time
+import tracemalloc
+
+from ps1 import State, load_election_results, find_winner, winner_states, ec_votes_reqd,\
+    greedy_election, dp_move_max_voters, move_min_voters, flip_election
+
+
+def synthetic_election(num_items, seed=0, ec_dist="uniform", ec_range=(1, 55),
+                       margin_dist="uniform", turnout_range=(10000, 5000000)):
+    """
+    Generates a reproducible synthetic election.
+
+    Parameters:
+    num_items - int, number of states (or districts) to generate
+    seed - int, seed for the random number generator
+    ec_dist - str, distribution of EC votes per item:
+              "uniform" (uniform over ec_range), "skewed" (few large items, many small ones)
+              or "constant" (every item gets ec_range[0])
+    ec_range - tuple, (smallest, largest) number of EC votes of an item
+    margin_dist - str, distribution of the dem vote share:
+                  "uniform" (between 30% and 70%) or "close" (normal around 50%, sd 5%)
+    turnout_range - tuple, (smallest, largest) number of votes cast in an item
+
+    Returns:
+    a list of State instances named D0, D1, ...
+    """
+
+    rng = random.Random(seed)
+    low, high = ec_range
+    election = []
+    for i in range(num_items):
+        if ec_dist == "uniform":
+            ec = rng.randint(low, high)
+        elif ec_dist == "skewed":
+            ec = min(high, low + int(rng.paretovariate(1.5)) - 1)
+        elif ec_dist == "constant":
+            ec = low
+        else:
+            raise ValueError("unknown ec_dist: %r" % (ec_dist,))
+
+        if margin_dist == "uniform":
+            share = rng.uniform(0.3, 0.7)
+        elif margin_dist == "close":
+            share = min(max(rng.gauss(0.5, 0.05), 0.0), 1.0)
+        else:
+            raise ValueError("unknown margin_dist: %r" % (margin_dist,))
+
+        turnout = rng.randint(*turnout_range)
+        dem = int(turnout * share)
+        election.append(State("D%d" % i, dem, turnout - dem, ec))
+    return election
+
+
+def write_election_results(election, filename):
+    """
+    Writes an election in the tab-delimited format read by load_election_results.
+
+    Parameters:
+    election - a list of State instances
+    filename - the name of the data file as a string
+    """
+
+    with open(filename, "w") as file:
+        file.write("State\tDemocrat_votes\tRepublican_votes\tEC_votes\n")
+        for state in election:
+            file.write("%s\t%d\t%d\t%d\n" % (state.get_name(), state.dem, state.gop, state.get_num_ecvotes()))
+
+
+def _measure(func, *args, **kwargs):
+    """
+    Runs func three times: once to warm up (lazy imports such as the NumPy
+    kernel, caches), once timed, once under tracemalloc for its peak allocation.
+
+    Returns:
+    a tuple (result, seconds, peak_bytes)
+    """
+
+    func(*args, **kwargs)
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    seconds = time.perf_counter() - start
+
+    tracemalloc.start()
+    func(*args, **kwargs)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result, seconds, peak
+
+
+def benchmark_size(num_items, max_dp_cells=2 * 10 ** 7, **generator_options):
+    """
+    Times and memory-profiles the analysis pipeline on one synthetic election.
+
+    Parameters:
+    num_items - int, number of states (or districts) to generate
+    max_dp_cells - int, dp_move_max_voters is skipped when items * EC capacity exceeds this
+                   (move_min_voters always runs, it switches to branch-and-bound itself)
+    generator_options - passed on to synthetic_election
+
+    Returns:
+    A dictionary with the size of the election and, per function, a dictionary
+    {"seconds": float, "peak_bytes": int} (or {"skipped": str})
+    """
+
+    election = synthetic_election(num_items, **generator_options)
+    total = sum(state.get_num_ecvotes() for state in election)
+    report = {"items": num_items, "total_ec": total, "functions": {}}
+    functions = report["functions"]
+
+    def record(name, func, *args, **kwargs):
+        result, seconds, peak = _measure(func, *args, **kwargs)
+        functions[name] = {"seconds": seconds, "peak_bytes": peak}
+        return result
+
+    with tempfile.TemporaryDirectory() as directory:
+        filename = os.path.join(directory, "results.txt")
+        write_election_results(election, filename)
+        record("load_election_results", load_election_results, filename)
+
+    record("find_winner", find_winner, election)
+    won_states = winner_states(election)
+    ec_votes_needed = ec_votes_reqd(election, total)
+    won_ec = sum(state.get_num_ecvotes() for state in won_states)
+    record("greedy_election", greedy_election, won_states, ec_votes_needed)
+
+    cells = len(won_states) * (won_ec - ec_votes_needed)
+    if cells > max_dp_cells:
+        functions["dp_move_max_voters"] = {"skipped": "%d DP cells exceeds max_dp_cells" % cells}
+    else:
+        record("dp_move_max_voters", dp_move_max_voters, won_states, won_ec - ec_votes_needed)
+    swing_states = record("move_min_voters", move_min_voters, won_states, ec_votes_needed)
+
+    record("flip_election", flip_election, election, swing_states, total=total)
+    return report
+
+
+def run_benchmarks(sizes, seed=0, max_dp_cells=2 * 10 ** 7, **generator_options):
+    """
+    Runs benchmark_size for every size.
+
+    Returns:
+    A dictionary with the run settings, the Python version and one report per size
+    """
+
+    return {
+        "python": platform.python_version(),
+        "seed": seed,
+        "generator": generator_options,
+        "max_dp_cells": max_dp_cells,
+        "results": [benchmark_size(size, max_dp_cells, seed=seed, **generator_options) for size in sizes],
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the election analysis functions on synthetic elections.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[50, 500, 5000, 100000])
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--ec-dist", default="uniform", choices=["uniform", "skewed", "constant"])
+    parser.add_argument("--ec-range", type=int, nargs=2, default=[1, 55])
+    parser.add_argument("--margin-dist", default="uniform", choices=["uniform", "close"])
+    parser.add_argument("--max-dp-cells", type=int, default=2 * 10 ** 7)
+    parser.add_argument("--output", default="bench_output.txt", help="where to write the JSON report")
+    args = parser.parse_args()
+
+    report = run_benchmarks(args.sizes, args.seed, args.max_dp_cells, ec_dist=args.ec_dist,
+                            ec_range=tuple(args.ec_range), margin_dist=args.margin_dist)
+    with open(args.output, "w") as file:
+        json.dump(report, file, indent=2)
+
+    for result in report["results"]:
+        for name, stats in result["functions"].items():
+            if "skipped" in stats:
+                print("%8d  %-22s skipped" % (result["items"], name))
+            else:
+                print("%8d  %-22s %10.4fs %12d bytes" % (result["items"], name, stats["seconds"], stats["peak_bytes"]))
@@ -0,0 +1,188 @@
+import hashlib
+import json
+import os
+import pickle
+import tempfile
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+from ps1 import move_min_voters, flip_election
+
+
+def election_digest(election):
+    """
+    Hashes the parsed contents of a list of states, so any change to a name,
+    vote count or EC vote count gives a different digest.
+
+    Parameters:
+    election - a list of State instances
+
+    Returns:
+    str, hex sha256 digest
+    """
+
+    digest = hashlib.sha256()
+    for state in election:
+        digest.update(("%s\t%d\t%d\t%d\n" % (state.get_name(), state.dem, state.gop,
+                                              state.get_num_ecvotes())).encode())
+    return digest.hexdigest()
+
+
+class ResultCache():
+    """
+    A persistent cache of analysis results in a directory, one pickle file per
+    entry, keyed by a hash of the input states, the function name and its
+    parameters. Changed input data hashes to a new key, so stale results are
+    never returned; they age out through the LRU eviction instead.
+
+    Entries are written to a temporary file and renamed into place, so several
+    processes can share a directory safely; eviction runs under a file lock.
+    """
+    def __init__(self, directory, max_bytes=64 * 1024 * 1024):
+        """
+        Parameters:
+        directory - str, where entries are stored (created if missing)
+        max_bytes - int, total size of the entries kept before the least
+                    recently used ones are evicted
+        """
+
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+
+    def key(self, func_name, states, **params):
+        """
+        Parameters:
+        func_name - str, name of the cached function
+        states - a list of lists of State instances, the inputs of the call
+        params - the remaining parameters of the call, JSON serializable
+
+        Returns:
+        str, the cache key
+        """
+
+        digest = hashlib.sha256(func_name.encode())
+        for group in states:
+            digest.update(election_digest(group).encode())
+        digest.update(json.dumps(params, sort_keys=True).encode())
+        return digest.hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + ".pickle")
+
+    def get(self, key):
+        """
+        Returns:
+        a tuple (found, value); found is False on a miss
+        """
+
+        path = self._path(key)
+        try:
+            with open(path, "rb") as file:
+                value = pickle.load(file)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            return False, None
+
+        # Mark as recently used (the entry may have just been evicted)
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return True, value
+
+    def put(self, key, value):
+        """
+        Stores value under key, then evicts old entries if over max_bytes.
+        """
+
+        handle, temp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(handle, "wb") as file:
+            pickle.dump(value, file, pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_path, self._path(key))
+        self._evict()
+
+    def get_or_compute(self, func_name, states, compute, **params):
+        """
+        Returns the cached result for (func_name, states, params), calling
+        compute() and storing its result on a miss.
+        """
+
+        key = self.key(func_name, states, **params)
+        found, value = self.get(key)
+        if not found:
+            value = compute()
+            self.put(key, value)
+        return value
+
+    @contextmanager
+    def _lock(self):
+        with open(os.path.join(self.directory, ".lock"), "w") as lock:
+            if fcntl is not None:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def _entries(self):
+        entries = []
+        for name in os.listdir(self.directory):
+            if name.endswith(".pickle"):
+                try:
+                    info = os.stat(os.path.join(self.directory, name))
+                except OSError:
+                    continue
+                entries.append((info.st_mtime, info.st_size, name))
+        return entries
+
+    def _evict(self):
+        with self._lock():
+            entries = self._entries()
+            size = sum(entry[1] for entry in entries)
+
+            # Drop least recently used entries first
+            for mtime, entry_size, name in sorted(entries):
+                if size <= self.max_bytes:
+                    break
+                try:
+                    os.remove(os.path.join(self.directory, name))
+                except OSError:
+                    continue
+                size -= entry_size
+
+    def clear(self):
+        with self._lock():
+            for mtime, size, name in self._entries():
+                try:
+                    os.remove(os.path.join(self.directory, name))
+                except OSError:
+                    pass
+
+
+def cached_move_min_voters(cache, winner_states, ec_votes_needed):
+    """
+    move_min_voters, through a ResultCache.
+    """
+
+    return cache.get_or_compute("move_min_voters", [winner_states],
+                                lambda: move_min_voters(winner_states, ec_votes_needed),
+                                ec_votes_needed=ec_votes_needed)
+
+
+def cached_flip_election(cache, election, swing_states, mode="order", total=538):
+    """
+    flip_election, through a ResultCache. The "min_cost" mode takes a distance
+    function, which cannot be part of a cache key, so only "order" and
+    "min_moves" are supported.
+    """
+
+    if mode not in ("order", "min_moves"):
+        raise ValueError("mode %r cannot be cached" % (mode,))
+    return cache.get_or_compute("flip_election", [election, swing_states],
+                                lambda: flip_election(election, swing_states, mode=mode, total=total),
+                                mode=mode, total=total)
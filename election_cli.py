@@ -0,0 +1,143 @@
+"""
+Command-line entry point for the election analyses.
+
+    python election_cli.py <subcommand> [options] FILE [FILE ...]
+
+Every input file produces one JSON object per line on stdout, written as soon
+as it is computed. Heavy dependencies are only imported by the subcommands
+that need them (NumPy for simulate).
+"""
+import argparse
+import json
+import sys
+
+from ps1 import load_election_results, find_winner, winner_states, ec_votes_reqd,\
+    greedy_election, move_min_voters, flip_election
+
+
+def _names(states):
+    return [state.get_name() for state in states]
+
+
+def _swing_summary(swing_states):
+    return {
+        "swing_states": _names(swing_states),
+        "voters": sum(state.get_margin() + 1 for state in swing_states),
+        "ec_votes": sum(state.get_num_ecvotes() for state in swing_states),
+    }
+
+
+def run_winner(election, args):
+    winner, loser = find_winner(election)
+    return {
+        "winner": winner,
+        "loser": loser,
+        "ec_votes_needed": ec_votes_reqd(election, args.total),
+        "winner_states": _names(winner_states(election)),
+    }
+
+
+def run_greedy(election, args):
+    return _swing_summary(greedy_election(winner_states(election), ec_votes_reqd(election, args.total)))
+
+
+def _optimal_swing_states(election, args):
+    return move_min_voters(winner_states(election), ec_votes_reqd(election, args.total),
+                           solver=args.solver, epsilon=args.epsilon, with_error_bound=True)
+
+
+def run_optimal(election, args):
+    swing_states, error_bound = _optimal_swing_states(election, args)
+    record = _swing_summary(swing_states)
+    record["error_bound"] = error_bound
+    return record
+
+
+def run_flip(election, args):
+    swing_states, error_bound = _optimal_swing_states(election, args)
+    flipped = flip_election(election, swing_states, mode=args.mode, total=args.total)
+    if flipped is None:
+        return {"flip": None, "error_bound": error_bound}
+    moves, ec_votes_gained, voters_moved = flipped
+    return {
+        "moves": [[from_state, to_state, voters] for (from_state, to_state), voters in moves.items()],
+        "ec_votes_gained": ec_votes_gained,
+        "voters_moved": voters_moved,
+        "error_bound": error_bound,
+    }
+
+
+def run_simulate(election, args):
+    from simulation import simulate_election
+
+    result = simulate_election(election, args.sigma, trials=args.trials,
+                               chunk_size=args.chunk_size, seed=args.seed)
+    result["ec_distribution"] = result["ec_distribution"].tolist()
+    return result
+
+
+SUBCOMMANDS = {
+    "winner": run_winner,
+    "greedy": run_greedy,
+    "optimal": run_optimal,
+    "flip": run_flip,
+    "simulate": run_simulate,
+}
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="election_cli", description="Election analyses with JSON lines output.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    def add(name, help_text, total=True):
+        subparser = subparsers.add_parser(name, help=help_text)
+        subparser.add_argument("files", nargs="+", help="<year>_results.txt style input files")
+
+        # simulate decides the winner like find_winner, from the EC votes won, so it takes no total
+        if total:
+            subparser.add_argument("--total", type=int, default=538, help="total possible number of EC votes")
+        return subparser
+
+    add("winner", "winner, loser and EC votes needed")
+    add("greedy", "greedy swing states")
+    for name, help_text in (("optimal", "minimum-relocation swing states"), ("flip", "voter moves that flip the election")):
+        subparser = add(name, help_text)
+        subparser.add_argument("--solver", default="auto", choices=["auto", "dp", "bnb", "sparse", "approx"])
+        subparser.add_argument("--epsilon", type=float, default=0.1,
+                               help="relative error allowed by the approx solver (reported as error_bound)")
+        if name == "flip":
+            subparser.add_argument("--mode", default="order", choices=["order", "min_moves"])
+
+    subparser = add("simulate", "Monte Carlo win probabilities under polling error", total=False)
+    subparser.add_argument("--sigma", type=float, required=True, help="standard deviation of each state's vote margin")
+    subparser.add_argument("--trials", type=int, default=100000)
+    subparser.add_argument("--chunk-size", type=int, default=100000)
+    subparser.add_argument("--seed", type=int, default=None)
+    return parser
+
+
+def main(argv=None):
+    """
+    Runs one subcommand over every input file.
+
+    Returns:
+    int, the exit status: 0 if every file succeeded, 1 otherwise
+    """
+
+    args = build_parser().parse_args(argv)
+    run = SUBCOMMANDS[args.command]
+    status = 0
+    for filename in args.files:
+        try:
+            record = {"file": filename}
+            record.update(run(load_election_results(filename), args))
+        except (OSError, ValueError, IndexError) as error:
+            record = {"file": filename, "error": str(error)}
+            status = 1
+        sys.stdout.write(json.dumps(record) + "\n")
+        sys.stdout.flush()
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
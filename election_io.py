@@ -0,0 +1,209 @@
+import mmap
+import os
+import struct
+from array import array
+from collections import namedtuple
+
+from ps1 import State
+
+
+# Columnar election data: names is a list of str, dem/gop/ec are int64 sequences
+# (array('q') when parsed from text, memoryviews over the file when mmapped)
+ElectionColumns = namedtuple("ElectionColumns", ["names", "dem", "gop", "ec"])
+
+# Snapshot layout (little endian):
+#   header     magic, version, reserved, number of states
+#   dem, gop, ec, name offsets (n + 1 entries), all int64
+#   names      utf-8 encoded, concatenated
+SNAPSHOT_MAGIC = b"ELSN"
+SNAPSHOT_VERSION = 1
+_HEADER = struct.Struct("<4sHHQ")
+
+
+def _parse_lines(lines, columns):
+    """
+    Parses tab-delimited result rows into columns, stopping at the first blank line.
+
+    Parameters:
+    lines - iterable of bytes, one row per item without the trailing newline
+    columns - ElectionColumns to append to
+
+    Returns:
+    bool, True if a blank line (end of data) was reached
+    """
+
+    names, dem, gop, ec = columns
+    for line in lines:
+        line = line.rstrip(b"\r")
+        if not line:
+            return True
+        fields = line.split(b"\t")
+        names.append(fields[0].decode())
+        dem.append(int(fields[1]))
+        gop.append(int(fields[2]))
+        ec.append(int(fields[3]))
+    return False
+
+
+def read_election_columns(filename):
+    """
+    Reads a results file (same format as load_election_results) in one bulk read
+    and parses it into columnar buffers.
+
+    Parameters:
+    filename - the name of the data file as a string
+
+    Returns:
+    an ElectionColumns with one entry per state
+    """
+
+    with open(filename, "rb") as file:
+        data = file.read()
+
+    # Skip the header line
+    lines = data.split(b"\n")[1:]
+    columns = ElectionColumns([], array("q"), array("q"), array("q"))
+    _parse_lines(lines, columns)
+    return columns
+
+
+def iter_election_results(filename, chunk_size=1 << 20):
+    """
+    Lazily yields the states of a results file, reading it in chunks so very
+    large (e.g. precinct level) files never have to fit in memory.
+
+    Parameters:
+    filename - the name of the data file as a string
+    chunk_size - int, number of bytes read at a time
+
+    Returns:
+    a generator of State instances
+    """
+
+    with open(filename, "rb") as file:
+        file.readline()
+        rest = b""
+        while True:
+            chunk = file.read(chunk_size)
+            lines = (rest + chunk).split(b"\n")
+
+            # Keep a partial last line for the next chunk (unless at end of file)
+            if chunk:
+                rest = lines.pop()
+
+            columns = ElectionColumns([], [], [], [])
+            finished = _parse_lines(lines, columns)
+            for row in zip(*columns):
+                yield State(*row)
+
+            if finished or not chunk:
+                return
+
+
+def columns_to_states(columns):
+    """
+    Parameters:
+    columns - an ElectionColumns
+
+    Returns:
+    a list of State instances, one per row
+    """
+
+    return [State(name, dem, gop, ec) for name, dem, gop, ec in zip(*columns)]
+
+
+def states_to_columns(election):
+    """
+    Parameters:
+    election - a list of State instances
+
+    Returns:
+    an ElectionColumns holding the same states
+    """
+
+    return ElectionColumns([state.get_name() for state in election],
+                           array("q", [state.dem for state in election]),
+                           array("q", [state.gop for state in election]),
+                           array("q", [state.get_num_ecvotes() for state in election]))
+
+
+def write_snapshot(columns, filename):
+    """
+    Writes election columns to a compact binary snapshot that load_snapshot
+    can map back without parsing.
+
+    Parameters:
+    columns - an ElectionColumns (or a list of State instances)
+    filename - the name of the snapshot file as a string
+    """
+
+    if not isinstance(columns, ElectionColumns):
+        columns = states_to_columns(columns)
+
+    encoded = [name.encode() for name in columns.names]
+    offsets = array("q", [0])
+    for name in encoded:
+        offsets.append(offsets[-1] + len(name))
+
+    # Write to a temporary file first so readers never see a partial snapshot
+    temp_name = "%s.%d.tmp" % (filename, os.getpid())
+    with open(temp_name, "wb") as file:
+        file.write(_HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, 0, len(encoded)))
+        for column in (columns.dem, columns.gop, columns.ec):
+            file.write(array("q", column).tobytes())
+        file.write(offsets.tobytes())
+        file.write(b"".join(encoded))
+    os.replace(temp_name, filename)
+
+
+def load_snapshot(filename):
+    """
+    Maps a snapshot written by write_snapshot into memory. The dem, gop and ec
+    columns are zero-copy int64 views over the mapped file.
+
+    Parameters:
+    filename - the name of the snapshot file as a string
+
+    Returns:
+    an ElectionColumns
+    """
+
+    with open(filename, "rb") as file:
+        mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    view = memoryview(mapped)
+    magic, version, reserved, n = _HEADER.unpack_from(view)
+    if magic != SNAPSHOT_MAGIC or version != SNAPSHOT_VERSION:
+        raise ValueError("%s is not a version %d election snapshot" % (filename, SNAPSHOT_VERSION))
+
+    # Each int64 column is a slice of the mapping, no data is copied
+    def column(index, length):
+        start = _HEADER.size + 8 * n * index
+        return view[start:start + 8 * length].cast("q")
+
+    dem, gop, ec, offsets = column(0, n), column(1, n), column(2, n), column(3, n + 1)
+
+    blob = view[_HEADER.size + 8 * (4 * n + 1):]
+    names = [bytes(blob[offsets[i]:offsets[i + 1]]).decode() for i in range(n)]
+    return ElectionColumns(names, dem, gop, ec)
+
+
+def load_election_columns(filename, snapshot=None):
+    """
+    Loads a results file through its binary snapshot, writing the snapshot on
+    first use and rewriting it whenever the text file is newer.
+
+    Parameters:
+    filename - the name of the data file as a string
+    snapshot - OPTIONAL name of the snapshot file (defaults to filename + ".snap")
+
+    Returns:
+    an ElectionColumns
+    """
+
+    if snapshot is None:
+        snapshot = filename + ".snap"
+
+    if not os.path.exists(snapshot) or os.path.getmtime(snapshot) < os.path.getmtime(filename):
+        write_snapshot(read_election_columns(filename), snapshot)
+    return load_snapshot(snapshot)
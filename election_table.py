@@ -0,0 +1,162 @@
+import numpy as np
+
+from ps1 import State
+
+
+class ElectionTable():
+    """
+    A columnar representation of an election. Each attribute of State is kept
+    as a NumPy array with one entry per state, so tallies become array
+    reductions instead of per-state method calls.
+    """
+    def __init__(self, names, dem, gop, ec):
+        """
+        Parameters:
+        names - sequence of str, the 2 letter abbreviation of each state
+        dem - sequence of ints, number of Democrat votes cast in each state
+        gop - sequence of ints, number of Republican votes cast in each state
+        ec - sequence of ints, number of EC votes each state has
+
+        Attributes:
+        self.names - array of str, the 2 letter abbreviation of each state
+        self.dem - int64 array, Democrat votes per state
+        self.gop - int64 array, Republican votes per state
+        self.ec - int64 array, EC votes per state
+        self.margin - int64 array, difference in votes cast between the two parties, positive
+        self.winner - array of str, the winner of each state, "dem" or "gop"
+        """
+
+        self.names = np.asarray(names, dtype=object)
+        self.dem = np.asarray(dem, dtype=np.int64)
+        self.gop = np.asarray(gop, dtype=np.int64)
+        self.ec = np.asarray(ec, dtype=np.int64)
+
+        if not (len(self.names) == len(self.dem) == len(self.gop) == len(self.ec)):
+            raise ValueError("all columns must have the same length")
+
+        # Derived columns, same rules as State (ties go to gop)
+        self.margin = np.abs(self.dem - self.gop)
+        self.winner = np.where(self.dem > self.gop, "dem", "gop")
+
+    @classmethod
+    def from_states(cls, election):
+        """
+        Parameters:
+        election - a list of State instances
+
+        Returns:
+        an ElectionTable holding the same states, in the same order
+        """
+
+        return cls([state.get_name() for state in election],
+                   [state.dem for state in election],
+                   [state.gop for state in election],
+                   [state.get_num_ecvotes() for state in election])
+
+    @classmethod
+    def from_columns(cls, columns):
+        """
+        Parameters:
+        columns - an election_io.ElectionColumns; int64 buffers (including the
+                  memoryviews of a mapped snapshot) are wrapped without copying
+
+        Returns:
+        an ElectionTable holding the same states, in the same order
+        """
+
+        return cls(columns.names,
+                   np.frombuffer(columns.dem, dtype=np.int64),
+                   np.frombuffer(columns.gop, dtype=np.int64),
+                   np.frombuffer(columns.ec, dtype=np.int64))
+
+    def to_states(self):
+        """
+        Returns:
+        a list of State instances, one per row of the table
+        """
+
+        return [State(str(name), int(dem), int(gop), int(ec))
+                for name, dem, gop, ec in zip(self.names, self.dem, self.gop, self.ec)]
+
+    def select(self, mask):
+        """
+        Parameters:
+        mask - boolean array (or index array) selecting rows
+
+        Returns:
+        a new ElectionTable with only the selected rows
+        """
+
+        return ElectionTable(self.names[mask], self.dem[mask], self.gop[mask], self.ec[mask])
+
+    def __len__(self):
+        return len(self.names)
+
+
+def ec_totals(table):
+    """
+    Tallies the EC votes won by each party.
+
+    Parameters:
+    table - an ElectionTable
+
+    Returns:
+    a tuple, (dem_ec, gop_ec) of the EC votes won by each party
+    """
+
+    dem_ec = int(table.ec[table.dem > table.gop].sum())
+    return dem_ec, int(table.ec.sum()) - dem_ec
+
+
+def find_winner(table):
+    """
+    Vectorized version of ps1.find_winner.
+
+    Parameters:
+    table - an ElectionTable
+
+    Returns:
+    a tuple, (winner, loser) of the election i.e. ('dem', 'gop') if Democrats won, else ('gop', 'dem')
+    """
+
+    dem_ec, gop_ec = ec_totals(table)
+    if dem_ec > gop_ec:
+        return ("dem", "gop")
+    else:
+        return ("gop", "dem")
+
+
+def winner_states(table):
+    """
+    Vectorized version of ps1.winner_states.
+
+    Parameters:
+    table - an ElectionTable
+
+    Returns:
+    an ElectionTable with the states won by the winning candidate
+    """
+
+    winner, loser = find_winner(table)
+    return table.select(table.winner == winner)
+
+
+def ec_votes_reqd(table, total=538):
+    """
+    Vectorized version of ps1.ec_votes_reqd.
+
+    Parameters:
+    table - an ElectionTable
+    total - total possible number of EC votes
+
+    Returns:
+    int, number of additional EC votes required by the loser to change the election outcome
+    """
+
+    dem_ec, gop_ec = ec_totals(table)
+
+    # Loser holds the smaller tally (ties go to gop, so dem loses them)
+    if dem_ec > gop_ec:
+        return (total // 2 + 1) - gop_ec
+    else:
+        return (total // 2 + 1) - dem_ec
@@ -0,0 +1,291 @@
+import asyncio
+import collections
+import json
+
+from ps1 import move_min_voters, flip_election
+from live import LiveElection
+
+
+def parse_update(line):
+    """
+    Parses one feed message. Messages are JSON objects, either with absolute
+    totals, {"state": "MA", "dem": 1200, "gop": 800}, or with vote changes,
+    {"state": "MA", "dem_delta": 15, "gop_delta": 3}.
+
+    Parameters:
+    line - str or bytes, one JSON encoded message
+
+    Returns:
+    dict, the decoded message
+    """
+
+    update = json.loads(line)
+    if not isinstance(update, dict) or "state" not in update:
+        raise ValueError("feed message has no 'state': %r" % (line,))
+    return update
+
+
+def validate_update(update, live):
+    """
+    Checks that an update can be applied to a LiveElection: it must be a dict
+    naming one of the election's states, and vote totals and changes must be ints
+    that leave both vote counts non-negative.
+
+    Parameters:
+    update - dict, a decoded feed message (see parse_update)
+    live - the LiveElection the update is for
+
+    Raises:
+    ValueError, describing the first problem found
+    """
+
+    if not isinstance(update, dict) or "state" not in update:
+        raise ValueError("feed message has no 'state': %r" % (update,))
+    try:
+        state = live.get_state(update["state"])
+    except (KeyError, TypeError):
+        raise ValueError("unknown state: %r" % (update["state"],))
+
+    for key in ("dem", "gop", "dem_delta", "gop_delta"):
+        if key in update and (not isinstance(update[key], int) or isinstance(update[key], bool)):
+            raise ValueError("%s is not an int: %r" % (key, update[key]))
+
+    if "dem" in update or "gop" in update:
+        dem, gop = update.get("dem", state.dem), update.get("gop", state.gop)
+    else:
+        dem, gop = state.dem + update.get("dem_delta", 0), state.gop + update.get("gop_delta", 0)
+    if dem < 0 or gop < 0:
+        raise ValueError("negative vote count for %s" % (update["state"],))
+
+
+async def queue_source(queue):
+    """
+    Yields updates put on an asyncio.Queue (used for in-process feeds and tests).
+    A None item ends the feed.
+    """
+
+    while True:
+        update = await queue.get()
+        if update is None:
+            return
+        yield update
+
+
+async def tail_source(path, poll_interval=0.1):
+    """
+    Yields the lines appended to a file, one JSON message per line, following
+    the file like `tail -f`. Runs until cancelled. Lines are parsed by the
+    service, so a malformed line is rejected on its own without ending the feed.
+    """
+
+    with open(path) as file:
+        partial = ""
+        while True:
+            line = file.readline()
+            if not line:
+                await asyncio.sleep(poll_interval)
+                continue
+
+            # Wait for the writer to finish the line
+            partial += line
+            if not partial.endswith("\n"):
+                continue
+            if partial.strip():
+                yield partial
+            partial = ""
+
+
+async def socket_source(host, port):
+    """
+    Yields the lines read from a TCP connection, one JSON message per line,
+    until the peer closes the connection. Lines are parsed by the service, as
+    for tail_source.
+    """
+
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        while True:
+            line = await reader.readline()
+            if not line:
+                return
+            if line.strip():
+                yield line
+    finally:
+        writer.close()
+
+
+def analyze_live(election, won_states, ec_votes_needed, version, total=538):
+    """
+    Runs the swing analysis on a snapshot of a LiveElection.
+
+    Returns:
+    A dictionary with the following (key, value) mapping:
+        - "version": int, LiveElection.version the analysis was computed for
+        - "ec_votes_needed": int, additional EC votes the loser needs
+        - "swing_states": list of str, names of the move_min_voters swing states
+        - "flip": the result of flip_election on those swing states
+    """
+
+    swing_states = move_min_voters(won_states, ec_votes_needed)
+    return {
+        "version": version,
+        "ec_votes_needed": ec_votes_needed,
+        "swing_states": [state.get_name() for state in swing_states],
+        "flip": flip_election(election, swing_states, total=total),
+    }
+
+
+class SwingAnalysisService():
+    """
+    Consumes result updates from a feed, keeps a LiveElection up to date and
+    publishes the latest swing analysis to subscribers.
+
+    Updates go through a bounded queue, so a fast feed is slowed down instead
+    of growing memory without bound. Bursts are coalesced: after an update the
+    service keeps draining the queue until it has been quiet for `debounce`
+    seconds (or `max_delay` has passed), then recomputes once. Nothing is
+    recomputed if the batch did not change any votes.
+
+    Every message is validated before it is applied; a bad message (malformed
+    JSON, unknown state, non-int votes) is counted and kept in self.rejected
+    instead of stopping the feed.
+    """
+    def __init__(self, election, debounce=0.05, max_delay=1.0, max_pending=1000, total=538, max_rejected=100):
+        """
+        Parameters:
+        election - a list of State instances, the results so far
+        debounce - float, seconds without updates before recomputing
+        max_delay - float, longest a pending update waits before recomputing
+        max_pending - int, maximum number of queued updates (backpressure)
+        total - total possible number of EC votes
+        max_rejected - int, number of most recent rejected messages kept
+
+        Attributes:
+        self.live - the LiveElection being updated
+        self.latest - dict, the latest published analysis (None before the first one)
+        self.recomputes - int, number of times the analysis was recomputed
+        self.rejected_count - int, number of messages rejected so far
+        self.rejected - deque of (message, reason) tuples, the most recent rejected messages
+        """
+
+        self.live = LiveElection(election, total)
+        self.debounce = debounce
+        self.max_delay = max_delay
+        self.latest = None
+        self.recomputes = 0
+        self.rejected_count = 0
+        self.rejected = collections.deque(maxlen=max_rejected)
+        self._pending = asyncio.Queue(max_pending)
+        self._subscribers = []
+        self._analyzed_version = None
+        self._feed_error = None
+
+    def subscribe(self):
+        """
+        Returns:
+        an asyncio.Queue receiving each new analysis. Slow subscribers only
+        ever see the most recent one; older unread analyses are dropped.
+        """
+
+        queue = asyncio.Queue(1)
+        if self.latest is not None:
+            queue.put_nowait(self.latest)
+        self._subscribers.append(queue)
+        return queue
+
+    def _publish(self, analysis):
+        self.latest = analysis
+        for queue in self._subscribers:
+            if queue.full():
+                queue.get_nowait()
+            queue.put_nowait(analysis)
+
+    def _apply(self, message):
+
+        # Lines from tail_source and socket_source still need parsing
+        try:
+            update = parse_update(message) if isinstance(message, (str, bytes)) else message
+            validate_update(update, self.live)
+        except ValueError as error:
+            self.rejected_count += 1
+            self.rejected.append((message, str(error)))
+            return
+
+        name = update["state"]
+        if "dem" in update or "gop" in update:
+            state = self.live.get_state(name)
+            self.live.set_votes(name, update.get("dem", state.dem), update.get("gop", state.gop))
+        else:
+            self.live.update(name, update.get("dem_delta", 0), update.get("gop_delta", 0))
+
+    async def _recompute(self):
+        if self.live.version == self._analyzed_version:
+            return
+        self._analyzed_version = self.live.version
+
+        # Snapshot the tracker, then solve off the event loop so ingestion keeps going
+        snapshot = (self.live.states(), list(self.live.winner_states()),
+                    self.live.ec_votes_reqd(), self.live.version, self.live.total)
+        loop = asyncio.get_running_loop()
+        analysis = await loop.run_in_executor(None, analyze_live, *snapshot)
+        self.recomputes += 1
+        self._publish(analysis)
+
+    async def _ingest(self, source):
+        try:
+            async for update in source:
+                await self._pending.put(update)
+        except Exception as error:
+            self._feed_error = error
+        await self._pending.put(None)
+
+    async def _process(self):
+        loop = asyncio.get_running_loop()
+        await self._recompute()
+        while True:
+            update = await self._pending.get()
+            if update is None:
+                return
+            self._apply(update)
+
+            # Coalesce the burst until the feed goes quiet or max_delay passes
+            deadline = loop.time() + self.max_delay
+            while True:
+                timeout = min(self.debounce, deadline - loop.time())
+                if timeout <= 0:
+                    break
+                try:
+                    update = await asyncio.wait_for(self._pending.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                if update is None:
+                    await self._recompute()
+                    return
+                self._apply(update)
+
+            await self._recompute()
+
+    async def run(self, source):
+        """
+        Consumes the source until it ends, recomputing and publishing the swing
+        analysis as updates arrive.
+
+        Parameters:
+        source - an async iterable of update dicts or JSON lines (queue_source,
+                 tail_source or socket_source)
+
+        Returns:
+        dict, the latest analysis
+        """
+
+        ingest = asyncio.ensure_future(self._ingest(source))
+        try:
+            await self._process()
+        finally:
+            ingest.cancel()
+
+        # Surface a broken feed (e.g. a lost connection) once the queue is drained
+        if self._feed_error is not None:
+            raise self._feed_error
+        return self.latest
+
@@ -0,0 +1,167 @@
+import atexit
+import functools
+import json
+import os
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+
+# Profiling is off unless enabled with profile() or the ELECTION_PROFILE
+# environment variable; when off, instrumented functions only pay for one
+# global lookup per call
+_enabled = False
+_trace_memory = False
+_stats = {}
+_counters = {}
+
+# Frames of the instrumented calls in progress, [start_bytes, child_peak_bytes]
+_memory_stack = []
+
+
+def instrumented(func):
+    """
+    Decorator recording call count, wall time and (optionally) peak allocation
+    of func while profiling is enabled. Times of nested instrumented calls are
+    included in their caller's time.
+    """
+
+    name = func.__name__
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if not _enabled:
+            return func(*args, **kwargs)
+
+        stats = _stats.setdefault(name, {"calls": 0, "seconds": 0.0, "peak_bytes": 0})
+        stats["calls"] += 1
+        if _trace_memory:
+            _enter_memory_frame()
+
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            stats["seconds"] += time.perf_counter() - start
+            if _trace_memory:
+                stats["peak_bytes"] = max(stats["peak_bytes"], _exit_memory_frame())
+
+    return wrapper
+
+
+def _enter_memory_frame():
+    current, peak = tracemalloc.get_traced_memory()
+
+    # Keep the caller's peak so far before resetting the shared peak counter
+    if _memory_stack:
+        _memory_stack[-1][1] = max(_memory_stack[-1][1], peak)
+    tracemalloc.reset_peak()
+    _memory_stack.append([current, 0])
+
+
+def _exit_memory_frame():
+    start, child_peak = _memory_stack.pop()
+    peak = max(tracemalloc.get_traced_memory()[1], child_peak)
+    if _memory_stack:
+        _memory_stack[-1][1] = max(_memory_stack[-1][1], peak)
+    return peak - start
+
+
+def count(name, amount=1):
+    """
+    Adds amount to the named counter while profiling is enabled.
+    """
+
+    if _enabled:
+        _counters[name] = _counters.get(name, 0) + amount
+
+
+def enable(trace_memory=False):
+    """
+    Starts profiling, clearing previous results.
+
+    Parameters:
+    trace_memory - bool, also record peak allocations (uses tracemalloc, much slower)
+    """
+
+    global _enabled, _trace_memory
+    reset()
+    _trace_memory = trace_memory
+    if trace_memory and not tracemalloc.is_tracing():
+        tracemalloc.start()
+    _enabled = True
+
+
+def disable():
+    """
+    Stops profiling; results stay available through report().
+    """
+
+    global _enabled, _trace_memory
+    _enabled = False
+    if _trace_memory:
+        tracemalloc.stop()
+    _trace_memory = False
+
+
+def reset():
+    _stats.clear()
+    _counters.clear()
+    del _memory_stack[:]
+
+
+def report():
+    """
+    Returns:
+    A dictionary with the following (key, value) mapping:
+        - "functions": dict, function name -> {"calls", "seconds", "peak_bytes"}
+        - "counters": dict, counter name -> int (e.g. knapsack table cells, memo hits and misses)
+        - "memo_hit_ratio": float, hits / lookups of the dp_move_max_voters memo (None if unused)
+    """
+
+    hits = _counters.get("dp_move_max_voters.memo_hits", 0)
+    lookups = hits + _counters.get("dp_move_max_voters.memo_misses", 0)
+    return {
+        "functions": {name: dict(stats) for name, stats in _stats.items()},
+        "counters": dict(_counters),
+        "memo_hit_ratio": hits / lookups if lookups else None,
+    }
+
+
+@contextmanager
+def profile(trace_memory=False):
+    """
+    Profiles the instrumented functions called inside the with block.
+
+        with instrument.profile() as results:
+            move_min_voters(won_states, ec_votes_needed)
+        print(results["functions"]["move_min_voters"]["seconds"])
+
+    Parameters:
+    trace_memory - bool, also record peak allocations
+
+    Returns:
+    a dictionary, filled with report() when the block exits
+    """
+
+    results = {}
+    enable(trace_memory)
+    try:
+        yield results
+    finally:
+        disable()
+        results.update(report())
+
+
+def _report_at_exit():
+    disable()
+    json.dump(report(), sys.stderr, indent=2)
+    sys.stderr.write("\n")
+
+
+# ELECTION_PROFILE=1 profiles the whole run, ELECTION_PROFILE=memory also traces
+# allocations; the report is written to stderr at exit
+if os.environ.get("ELECTION_PROFILE"):
+    enable(trace_memory=os.environ["ELECTION_PROFILE"] == "memory")
+    atexit.register(_report_at_exit)
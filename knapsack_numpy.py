@@ -0,0 +1,112 @@
+import numpy as np
+
+
+def knapsack_table(weights, values, capacity):
+    """
+    NumPy version of ps1._knapsack_table, with the same inputs and outputs.
+
+    Each item is applied to the whole value row at once: the row shifted by the
+    item's weight plus its value is compared against the row, and np.maximum
+    keeps the better one. As in the pure Python kernel an item is only taken
+    when strictly better, and the per-item decisions are packed with
+    np.packbits into the same big-endian bitmap layout, so backtracking and
+    tie-breaking are identical.
+
+    Parameters:
+    weights - a list of ints, the weight (#ec_votes) of each item
+    values - a list of ints, the value (#margin) of each item
+    capacity - int, the largest total weight to consider
+
+    Returns:
+    A tuple (best, choice, stride), see ps1._knapsack_table
+    """
+
+    stride = (capacity + 8) // 8
+    choice = np.zeros((len(weights), stride), dtype=np.uint8)
+    best = np.zeros(capacity + 1, dtype=np.int64)
+    take = np.zeros(capacity + 1, dtype=bool)
+
+    # Iterate through the items backwards (row i depends on row i+1)
+    for i in range(len(weights) - 1, -1, -1):
+        weight = weights[i]
+        if weight > capacity:
+            continue
+
+        # with_value[c - weight] = best[c - weight] + value, for c >= weight
+        with_value = best[:capacity + 1 - weight] + values[i]
+        take[:weight] = False
+        np.greater(with_value, best[weight:], out=take[weight:])
+        np.maximum(best[weight:], with_value, out=best[weight:])
+        choice[i] = np.packbits(take)
+
+    return best.tolist(), choice.tobytes(), stride
+
+
+def min_weight_table(weights, values, top, unreachable):
+    """
+    NumPy version of the table in ps1.dp_move_max_voters_approx: for every
+    scaled margin p, the smallest EC weight of a set of items worth exactly p.
+    As in the pure Python loop an item is only taken when strictly lighter,
+    and the decisions use the same packed bitmap layout as knapsack_table.
+
+    Parameters:
+    weights - a list of ints, the weight (#ec_votes) of each item
+    values - a list of ints, the scaled value of each item (sum(values) == top)
+    top - int, the largest scaled margin
+    unreachable - int, the weight marking a margin no set reaches (ec_votes + 1)
+
+    Returns:
+    A tuple (min_weight, choice, stride), min_weight as a list and choice as bytes
+    """
+
+    stride = (top + 8) // 8
+    choice = np.zeros((len(weights), stride), dtype=np.uint8)
+    min_weight = np.full(top + 1, unreachable, dtype=np.int64)
+    min_weight[0] = 0
+    take = np.zeros(top + 1, dtype=bool)
+
+    for k in range(len(weights) - 1, -1, -1):
+        value = values[k]
+
+        # with_weight[p - value] = min_weight[p - value] + weight, for p >= value
+        with_weight = min_weight[:top + 1 - value] + weights[k]
+        take[:value] = False
+        np.less(with_weight, min_weight[value:], out=take[value:])
+        np.minimum(min_weight[value:], with_weight, out=min_weight[value:])
+        choice[k] = np.packbits(take)
+
+    return min_weight.tolist(), choice.tobytes(), stride
+
+
+def leave_one_out_kept(weights, values, capacity, remaining):
+    """
+    NumPy version of ps1._leave_one_out_kept, with the same inputs and outputs.
+
+    The forward (prefix) rows are kept as one int64 array; the row for the
+    items after i is a single rolling row, and the best split of remaining[i]
+    between the two is one vectorized max over the row and the reversed row.
+    """
+
+    n = len(weights)
+    forward = np.zeros((n + 1, capacity + 1), dtype=np.int64)
+    for i in range(n):
+        forward[i + 1] = forward[i]
+        weight = weights[i]
+        if weight <= capacity:
+            np.maximum(forward[i + 1, weight:], forward[i, :capacity + 1 - weight] + values[i],
+                       out=forward[i + 1, weight:])
+
+    after = np.zeros(capacity + 1, dtype=np.int64)
+    kept = [None] * n
+    for i in range(n - 1, -1, -1):
+
+        # before[a] + after[r - a] for every split a of the remaining capacity r
+        r = remaining[i]
+        if r >= 0:
+            kept[i] = int((forward[i, :r + 1] + after[r::-1]).max())
+
+        weight = weights[i]
+        if weight <= capacity:
+            np.maximum(after[weight:], after[:capacity + 1 - weight] + values[i], out=after[weight:])
+
+    return kept, int(after[capacity])
@@ -0,0 +1,146 @@
+from ps1 import State
+
+
+class LiveElection():
+    """
+    An election that is updated one state at a time as results come in.
+
+    The EC totals of both parties are kept as running sums, so applying a vote
+    change to a state is O(1). The list of states won by the winner is cached
+    and only rebuilt after some state changes hands; margin-only updates patch
+    the cached list in place.
+    """
+    def __init__(self, election, total=538):
+        """
+        Parameters:
+        election - a list of State instances, the results so far
+        total - total possible number of EC votes
+
+        Attributes:
+        self.total - int, total possible number of EC votes
+        self.dem_ec - int, EC votes currently won by dem
+        self.gop_ec - int, EC votes currently won by gop
+        self.version - int, incremented every time any state's votes change
+        self.flips - int, incremented every time a state changes hands
+        """
+
+        self.total = total
+        self._states = {}
+        self.dem_ec, self.gop_ec = 0, 0
+        for state in election:
+            self._states[state.get_name()] = state
+            self._add_ec(state, 1)
+
+        self.version = 0
+        self.flips = 0
+        self._winner_states = None
+        self._winner_index = None
+
+    def _add_ec(self, state, sign):
+        if state.get_winner() == "dem":
+            self.dem_ec += sign * state.get_num_ecvotes()
+        else:
+            self.gop_ec += sign * state.get_num_ecvotes()
+
+    def set_votes(self, name, dem, gop):
+        """
+        Replaces the vote counts of one state.
+
+        Parameters:
+        name - the 2 letter abbreviation of the state
+        dem - new number of Democrat votes cast
+        gop - new number of Republican votes cast
+
+        Returns:
+        bool, True if the state changed hands
+        """
+
+        old = self._states[name]
+        if old.dem == dem and old.gop == gop:
+            return False
+
+        new = State(name, dem, gop, old.get_num_ecvotes())
+        self._states[name] = new
+        self.version += 1
+
+        if new.get_winner() == old.get_winner():
+
+            # Same winner: aggregates are unchanged, only patch the cached entry
+            if self._winner_index is not None and name in self._winner_index:
+                self._winner_states[self._winner_index[name]] = new
+            return False
+
+        # State changed hands: move its EC votes and drop the cached split
+        self._add_ec(old, -1)
+        self._add_ec(new, 1)
+        self.flips += 1
+        self._winner_states = None
+        self._winner_index = None
+        return True
+
+    def update(self, name, dem_delta=0, gop_delta=0):
+        """
+        Applies a vote change to one state.
+
+        Parameters:
+        name - the 2 letter abbreviation of the state
+        dem_delta - int, change in Democrat votes
+        gop_delta - int, change in Republican votes
+
+        Returns:
+        bool, True if the state changed hands
+        """
+
+        state = self._states[name]
+        return self.set_votes(name, state.dem + dem_delta, state.gop + gop_delta)
+
+    def get_state(self, name):
+        """
+        Returns:
+        the current State instance for the given 2 letter abbreviation
+        """
+
+        return self._states[name]
+
+    def states(self):
+        """
+        Returns:
+        a list of the current State instances, in the original order
+        """
+
+        return list(self._states.values())
+
+    def find_winner(self):
+        """
+        Returns:
+        a tuple, (winner, loser) of the election, same as ps1.find_winner
+        """
+
+        if self.dem_ec > self.gop_ec:
+            return ("dem", "gop")
+        else:
+            return ("gop", "dem")
+
+    def winner_states(self):
+        """
+        Returns:
+        A list of State instances won by the winning candidate, same as ps1.winner_states.
+        The list is shared with the tracker and must not be modified.
+        """
+
+        if self._winner_states is None:
+            winner, loser = self.find_winner()
+            self._winner_states = [state for state in self._states.values() if state.get_winner() == winner]
+            self._winner_index = {state.get_name(): i for i, state in enumerate(self._winner_states)}
+        return self._winner_states
+
+    def ec_votes_reqd(self):
+        """
+        Returns:
+        int, number of additional EC votes required by the loser to change the election outcome
+        """
+
+        if self.dem_ec > self.gop_ec:
+            return (self.total // 2 + 1) - self.gop_ec
+        else:
+            return (self.total // 2 + 1) - self.dem_ec
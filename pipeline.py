@@ -0,0 +1,105 @@
+import argparse
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+
+from ps1 import load_election_results
+from batch import analyze_election
+
+
+# Result files are named <year>_results.txt, as in the ps1 __main__ block
+RESULTS_FILE = re.compile(r"^(\d{4})_results\.txt$")
+
+TABLE_COLUMNS = ["year", "winner", "ec_votes_needed", "greedy_voters", "optimal_voters",
+                 "flip_moves", "flip_voters"]
+
+
+def find_result_files(directory):
+    """
+    Parameters:
+    directory - str, directory holding <year>_results.txt files
+
+    Returns:
+    a list of (year, path) tuples, sorted by year
+    """
+
+    files = []
+    for name in os.listdir(directory):
+        match = RESULTS_FILE.match(name)
+        if match:
+            files.append((int(match.group(1)), os.path.join(directory, name)))
+    return sorted(files)
+
+
+def analyze_year(year, path, total=538):
+    """
+    Parses one year's results once and runs the whole analysis chain on it.
+
+    Returns:
+    A dictionary with one row of the consolidated table:
+        - "year": int
+        - "winner": str, "dem" or "gop"
+        - "ec_votes_needed": int, additional EC votes the loser needs
+        - "greedy_voters", "optimal_voters": int, voters displaced by each strategy
+        - "flip_moves": int, number of (from_state, to_state) moves in the flip plan (None if no plan)
+        - "flip_voters": int, voters moved by the flip plan (None if no plan)
+    """
+
+    analysis = analyze_election(load_election_results(path), total)
+    flip = analysis["flip"]
+    return {
+        "year": year,
+        "winner": analysis["winner"],
+        "ec_votes_needed": analysis["ec_votes_needed"],
+        "greedy_voters": analysis["greedy_voters"],
+        "optimal_voters": analysis["optimal_voters"],
+        "flip_moves": len(flip[0]) if flip is not None else None,
+        "flip_voters": flip[2] if flip is not None else None,
+    }
+
+
+def analyze_years(directory, workers=None, total=538):
+    """
+    Runs analyze_year on every <year>_results.txt file in directory, one year
+    per worker process.
+
+    Parameters:
+    directory - str, directory holding <year>_results.txt files
+    workers - int, number of worker processes (defaults to os.cpu_count())
+    total - total possible number of EC votes
+
+    Returns:
+    a list of table rows (see analyze_year), sorted by year
+    """
+
+    files = find_result_files(directory)
+    if files == []:
+        return []
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(analyze_year, [year for year, path in files],
+                                 [path for year, path in files], [total] * len(files)))
+
+
+def format_table(rows):
+    """
+    Parameters:
+    rows - a list of table rows from analyze_years
+
+    Returns:
+    str, the rows as a tab-separated table with a header line
+    """
+
+    lines = ["\t".join(TABLE_COLUMNS)]
+    for row in rows:
+        lines.append("\t".join("-" if row[column] is None else str(row[column]) for column in TABLE_COLUMNS))
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Analyze every <year>_results.txt file in a directory.")
+    parser.add_argument("directory", nargs="?", default=".")
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    print(format_table(analyze_years(args.directory, args.workers)))
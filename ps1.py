@@ -1,3 +1,10 @@
+import bisect
+import heapq
+
+import allocation
+from instrument import instrumented, count
+
+
 
 # Problem 1
 class State():
@@ -6,7 +13,12 @@ class State():
     Assumes there are no ties between dem and gop votes. The party with a 
     majority of votes receives all the Electoral College (EC) votes for 
     the given state.
+
+    Instances are immutable and hashable, so they can be used in sets and as
+    dictionary keys.
     """
+    __slots__ = ("name", "dem", "gop", "ec", "margin", "winner")
+
     def __init__(self, name, dem, gop, ec):
         """
         Parameters:
@@ -22,17 +34,30 @@ class State():
         self.ec - int, number of EC votes a state has
         """
         
-        # Class parameters
-        self.name = name
-        self.dem = dem 
-        self.gop = gop 
-        self.ec = ec 
-        self.margin = abs(self.dem - self.gop)
-        if self.dem > self.gop:
-            self.winner = "dem"
+        # Class parameters (set through object.__setattr__, instances are immutable)
+        object.__setattr__(self, "name", name)
+        object.__setattr__(self, "dem", dem)
+        object.__setattr__(self, "gop", gop)
+        object.__setattr__(self, "ec", ec)
+        object.__setattr__(self, "margin", abs(dem - gop))
+        if dem > gop:
+            object.__setattr__(self, "winner", "dem")
         else:
-            self.winner = "gop"
+            object.__setattr__(self, "winner", "gop")
         
+    def __setattr__(self, attr, value):
+        raise AttributeError("State instances are immutable")
+
+    def __delattr__(self, attr):
+        raise AttributeError("State instances are immutable")
+
+    def __reduce__(self):
+        """
+        Returns:
+        tuple, allows State instances to be pickled (e.g. sent to worker processes)
+        """
+
+        return (State, (self.name, self.dem, self.gop, self.ec))
  
     def get_name(self):
         """
@@ -95,20 +120,26 @@ class State():
         """
         
         # Check if self and other are instances of State class
-        if isinstance(self, State) and isinstance(other, State):
+        if isinstance(other, State):
             
-            # Compare names, dem and gop numbers, and ec votes
-            if self.get_name() == other.get_name() and self.get_winner() == other.get_winner()\
-                and self.get_margin() == other.get_margin() and self.get_num_ecvotes() == other.get_num_ecvotes():
-                    return True
-            else:
-                return False
+            # Compare names, winners, margins, and ec votes
+            return str(self.name) == str(other.name) and self.winner == other.winner\
+                and self.margin == other.margin and self.ec == other.ec
             
         else:
             return False
 
+    def __hash__(self):
+        """
+        Returns:
+        int, hash consistent with __eq__ (name, winner, margin and ec votes)
+        """
+
+        return hash((str(self.name), self.winner, self.margin, self.ec))
+
 
 # Problem 2
+@instrumented
 def load_election_results(filename):
     """
     Reads the contents of a file, with data given in the following tab-delimited format,
@@ -121,47 +152,41 @@ def load_election_results(filename):
     a list of State instances
     """
     
-    # Open file
-    file = open(filename)
-    
-    # Read first and second lines (no need to keep the first line)
-    file.readline()
-    header_line = file.readline()
-    
     # Create a list for storing State instances
     state_list = []
     
-    # Read lines as long as file and line are not empty
-    while header_line != "" and header_line != "\n":
-        
-        # Split the line on tabs
-        header_line = header_line.split("\t")
-        
-        # Remove \n
-        if "\n" in header_line[3]:
-            header_line[3] = header_line[3][:len(header_line[3])-1]
+    # Open file (closed again when done reading)
+    with open(filename) as file:
         
-        # Store State instances
-        state_list.append(State(header_line[0], int(header_line[1]), int(header_line[2]), int(header_line[3])))
-        
-        # Read next line
+        # Read first and second lines (no need to keep the first line)
+        file.readline()
         header_line = file.readline()
+        
+        # Read lines as long as file and line are not empty
+        while header_line != "" and header_line != "\n":
+            
+            # Split the line on tabs (rstrip removes \n)
+            header_line = header_line.rstrip("\n").split("\t")
+            
+            # Store State instances
+            state_list.append(State(header_line[0], int(header_line[1]), int(header_line[2]), int(header_line[3])))
+            
+            # Read next line
+            header_line = file.readline()
     
     return state_list
 
 
 # Problem 3
-def find_winner(election):
+def _ec_totals(election):
     """
-    Finds the winner of the election based on who has the most amount of EC votes.
-    Note: In this simplified representation, all of EC votes from a state go
-    to the party with the majority vote.
+    Tallies the EC votes won by each party.
 
     Parameters:
     election - a list of State instances 
 
     Returns:
-    a tuple, (winner, loser) of the election i.e. ('dem', 'gop') if Democrats won, else ('gop', 'dem')
+    a tuple, (dem_ec, gop_ec) of the EC votes won by each party
     """
     
     # Initialize electoral votes for dem and gop
@@ -175,6 +200,25 @@ def find_winner(election):
             dem_ec += state.get_num_ecvotes() 
         else:
             gop_ec += state.get_num_ecvotes() 
+    
+    return dem_ec, gop_ec
+
+
+@instrumented
+def find_winner(election):
+    """
+    Finds the winner of the election based on who has the most amount of EC votes.
+    Note: In this simplified representation, all of EC votes from a state go
+    to the party with the majority vote.
+
+    Parameters:
+    election - a list of State instances 
+
+    Returns:
+    a tuple, (winner, loser) of the election i.e. ('dem', 'gop') if Democrats won, else ('gop', 'dem')
+    """
+    
+    dem_ec, gop_ec = _ec_totals(election)
      
     # Compare electoral values, return (winner, loser)
     if dem_ec > gop_ec:
@@ -183,6 +227,7 @@ def find_winner(election):
         return ("gop", "dem")
     
     
+@instrumented
 def winner_states(election):
     """
     Finds the list of States that were won by the winning candidate (lost by the losing candidate).
@@ -213,6 +258,7 @@ def winner_states(election):
     return winner_states
             
             
+@instrumented
 def ec_votes_reqd(election, total=538):
     """
     Finds the number of additional EC votes required by the loser to change election outcome.
@@ -226,20 +272,9 @@ def ec_votes_reqd(election, total=538):
     int, number of additional EC votes required by the loser to change the election outcome
     """
     
-    # Get winner and loser candidate
-    winner, loser = find_winner(election)
-    
-    # Initialize electoral votes for dem and gop
-    dem_ec, gop_ec = 0, 0
-    
-    # Iterate through the State instances
-    for state in election:
-        
-        # Update electoral votes for dem and gop
-        if state.get_winner() == "dem":
-            dem_ec += state.get_num_ecvotes() 
-        else:
-            gop_ec += state.get_num_ecvotes() 
+    # Tally once and derive the loser from the same totals
+    dem_ec, gop_ec = _ec_totals(election)
+    loser = "gop" if dem_ec > gop_ec else "dem"
     
     # Find the difference between votes needed to win and actual electoral votes
     if loser == "dem":
@@ -249,6 +284,7 @@ def ec_votes_reqd(election, total=538):
                     
                      
 # Problem 4
+@instrumented
 def greedy_election(winner_states, ec_votes_needed):
     """
     Finds a subset of winner_states that would change an election outcome if
@@ -267,8 +303,13 @@ def greedy_election(winner_states, ec_votes_needed):
     The empty list, if no possible swing states
     """
     
-    # Sort states (increasing margin, decreasing ec votes)
-    sorted_winner_states = sorted(winner_states, key = lambda x : (x.get_margin(), x.get_num_ecvotes() * -1))
+    # Infeasible if all the winner's EC votes together are not enough
+    if sum(state.get_num_ecvotes() for state in winner_states) < ec_votes_needed:
+        return []
+    
+    # Heap of states (increasing margin, decreasing ec votes, original order for ties)
+    heap = [(state.get_margin(), -state.get_num_ecvotes(), i) for i, state in enumerate(winner_states)]
+    heapq.heapify(heap)
     
     # Initialize ec votes added and an empty list for saving flipped states
     ec_votes_added = 0
@@ -276,17 +317,118 @@ def greedy_election(winner_states, ec_votes_needed):
     
     # Keep adding states to the "knapsack" (flipped_states) till you reach the number of ec votes needed
     while ec_votes_added < ec_votes_needed:
-        state = sorted_winner_states[0]
-        flipped_states.append(state)
-        ec_votes_added += state.get_num_ecvotes()
-        
-        # Remove state already added to knapsack from original list (sorted_winner_states)
-        sorted_winner_states.remove(state)
+        margin, neg_ec, i = heapq.heappop(heap)
+        flipped_states.append(winner_states[i])
+        ec_votes_added -= neg_ec
         
     return flipped_states
                 
 
 # Problem 5
+# Tables with at least this many cells use the NumPy kernel (knapsack_numpy)
+# when NumPy is installed
+NUMPY_MIN_CELLS = 10000
+
+# The knapsack_numpy module once imported, False if NumPy is not available
+_numpy_kernel = None
+
+
+def _load_numpy_kernel():
+    """
+    Returns:
+    the knapsack_numpy module, or False if NumPy is not installed
+    """
+    
+    global _numpy_kernel
+    if _numpy_kernel is None:
+        try:
+            import knapsack_numpy
+            _numpy_kernel = knapsack_numpy
+        except ImportError:
+            _numpy_kernel = False
+    return _numpy_kernel
+
+
+def _knapsack_table(weights, values, capacity):
+    """
+    Builds the bottom-up 0/1 knapsack table for the given items.
+
+    Items are processed from last to first so that row i describes the best
+    choice for items i..n-1, which mirrors the order the recursive formulation
+    explored them in. Only one rolling row of values is kept; the decisions are
+    stored in a packed bitmap with one bit per (item, capacity) cell. Large
+    tables are built by the NumPy kernel in knapsack_numpy when available.
+
+    Parameters:
+    weights - a list of ints, the weight (#ec_votes) of each item
+    values - a list of ints, the value (#margin) of each item
+    capacity - int, the largest total weight to consider
+
+    Returns:
+    A tuple (best, choice, stride) where
+        - best is a list of ints, best[c] is the largest value reachable with total weight <= c
+        - choice is a bytearray, bit c of row i is set if item i is taken at capacity c
+        - stride is an int, the number of bytes per row of choice
+    """
+    
+    count("knapsack.table_cells", len(weights) * (capacity + 1))
+    count("knapsack.bitmap_bytes", len(weights) * ((capacity + 8) // 8))
+    
+    # Large tables run one NumPy row operation per item (values must fit in int64)
+    if len(weights) * (capacity + 1) >= NUMPY_MIN_CELLS and sum(values) < 2 ** 63 and _load_numpy_kernel():
+        return _numpy_kernel.knapsack_table(weights, values, capacity)
+    
+    # Row size in bytes of the packed choice bitmap
+    stride = (capacity + 8) // 8
+    choice = bytearray(stride * len(weights))
+    best = [0] * (capacity + 1)
+    
+    # Iterate through the items backwards (row i depends on row i+1)
+    for i in range(len(weights) - 1, -1, -1):
+        weight = weights[i]
+        value = values[i]
+        row = i * stride
+        
+        # Walk capacities downwards so best[c - weight] still holds row i+1
+        for c in range(capacity, weight - 1, -1):
+            with_value = best[c - weight] + value
+            
+            # Only take the item if strictly better (ties keep the item out)
+            if with_value > best[c]:
+                best[c] = with_value
+                choice[row + (c >> 3)] |= 0x80 >> (c & 7)
+    
+    return best, choice, stride
+
+
+def _knapsack_backtrack(weights, choice, stride, capacity):
+    """
+    Recovers the items chosen by _knapsack_table for a given capacity.
+
+    Parameters:
+    weights - a list of ints, the weight of each item
+    choice - bytearray, the packed choice bitmap built by _knapsack_table
+    stride - int, the number of bytes per row of choice
+    capacity - int, the capacity to reconstruct the choice for
+
+    Returns:
+    A list of item indices, in the order the recursive formulation returned them
+    (last item first)
+    """
+    
+    taken = []
+    c = capacity
+    for i in range(len(weights)):
+        if choice[i * stride + (c >> 3)] & (0x80 >> (c & 7)):
+            taken.append(i)
+            c -= weights[i]
+    
+    # Recursive version appended each item after solving the rest of the list
+    taken.reverse()
+    return taken
+
+
+@instrumented
 def dp_move_max_voters(winner_states, ec_votes, memo = None):
     """
     Finds the largest number of voters needed to relocate to get at most ec_votes
@@ -298,13 +440,14 @@ def dp_move_max_voters(winner_states, ec_votes, memo = None):
     is less than or equal to the given limit(ec_votes) and the total value(#voters displaced)
     is as large as possible.
 
-	Hint: If using a top-down implementation, it may be helpful to create a helper function
+    Solved bottom-up with a single rolling row over EC capacity and a packed
+    choice bitmap, so it runs in O(n * ec_votes) time without recursion.
 
     Parameters:
     winner_states - a list of State instances that were won by the winner 
     ec_votes - int, the maximum number of EC votes 
     memo - dictionary, an OPTIONAL parameter for memoization (don't delete!).
-    Note: If you decide to use the memo make sure to override the default value when it's first called.
+    Note: If given, results are cached in it keyed by (len(winner_states), ec_votes).
 
     Returns:
     A list of State instances such that the maximum number of voters need to be relocated
@@ -315,59 +458,271 @@ def dp_move_max_voters(winner_states, ec_votes, memo = None):
     # Objective Function: maximize value (margin)
     # Constraint: weight (ec_votes)
     
-    # Initialize memo as a dictionary
-    if memo == None:
-        memo = {}
-        
-    # Check if key already exists in memo   
-    if (len(winner_states), ec_votes) in memo:
-        return memo[(len(winner_states), ec_votes)]
+    # Check if key already exists in memo
+    if memo is not None:
+        if (len(winner_states), ec_votes) in memo:
+            count("dp_move_max_voters.memo_hits")
+            return memo[(len(winner_states), ec_votes)]
+        count("dp_move_max_voters.memo_misses")
     
-    # Check if winner_states list is empty or no ec votes are needed    
-    elif winner_states == [] or ec_votes == 0:
+    # Check if winner_states list is empty or no ec votes are available
+    if winner_states == [] or ec_votes <= 0:
         return []
     
-    # Check if state's ec votes exceed needed ec votes    
-    elif winner_states[0].get_num_ecvotes() > ec_votes:
-        
-        # Explore right branch only (first item could not be taken)
-        return dp_move_max_voters(winner_states[1:], ec_votes, memo)
+    weights = [state.get_num_ecvotes() for state in winner_states]
+    values = [state.get_margin() for state in winner_states]
+    
+    # Capacity beyond the total weight never changes the answer
+    capacity = min(ec_votes, sum(weights))
+    
+    best, choice, stride = _knapsack_table(weights, values, capacity)
+    result = [winner_states[i] for i in _knapsack_backtrack(weights, choice, stride, capacity)]
     
-    # If item can be taken:
+    # Update memo
+    if memo is not None:
+        memo[(len(winner_states), ec_votes)] = result
+    return result
+
+
+@instrumented
+def reachable_ec_totals(winner_states):
+    """
+    Finds every EC total some subset of winner_states adds up to exactly, as a
+    subset sum over get_num_ecvotes() done with shift-or on one big integer.
+    Much cheaper than dp_move_max_voters, so useful as a pre-filter for queries
+    about exact EC totals (at-least queries only need the total EC votes).
+
+    Parameters:
+    winner_states - a list of State instances that were won by the winner 
+
+    Returns:
+    int, a bitset: bit k is set if some subset of winner_states is worth exactly k EC votes
+    """
+    
+    reachable = 1
+    for state in winner_states:
+        reachable |= reachable << state.get_num_ecvotes()
+    return reachable
+
+
+@instrumented
+def can_reach_ec(winner_states, ec_votes, exact = False, reachable = None):
+    """
+    Determines if the loser can gain ec_votes EC votes from some subset of winner_states.
+
+    Parameters:
+    winner_states - a list of State instances that were won by the winner 
+    ec_votes - int, the number of EC votes to reach
+    exact - bool, if True the subset must be worth exactly ec_votes, otherwise at least ec_votes
+    reachable - OPTIONAL bitset from reachable_ec_totals(winner_states), to reuse across exact queries
+
+    Returns:
+    bool, True if some subset reaches ec_votes
+    """
+    
+    if ec_votes <= 0:
+        return ec_votes == 0 or not exact
+    
+    # At least ec_votes only needs the total, the bitset is for exact totals
+    if not exact:
+        return sum(state.get_num_ecvotes() for state in winner_states) >= ec_votes
+    if reachable is None:
+        reachable = reachable_ec_totals(winner_states)
+    return bool((reachable >> ec_votes) & 1)
+
+
+@instrumented
+def reachable_totals(winner_states):
+    """
+    Parameters:
+    winner_states - a list of State instances that were won by the winner 
+
+    Returns:
+    a sorted list of ints, every EC total some subset of winner_states adds up to exactly
+    """
+    
+    # Decode all bits in one pass (lowest bit first)
+    reachable = reachable_ec_totals(winner_states)
+    return [k for k, bit in enumerate(bin(reachable)[:1:-1]) if bit == "1"]
+
+
+# Largest knapsack table (choice bitmap plus value row, in bytes) move_min_voters
+# builds before switching to the branch-and-bound solver
+DP_MEMORY_BUDGET = 256 * 1024 * 1024
+
+# Search nodes move_min_voters lets the branch-and-bound solver expand before
+# falling back to move_min_voters_sparse (the fractional bound cannot prune when
+# every state has about the same margin per EC vote)
+BNB_NODE_BUDGET = 200000
+
+
+def _knapsack_memory(num_items, capacity):
+    """
+    Returns:
+    int, approximate bytes used by _knapsack_table for these dimensions
+    """
+    
+    return num_items * ((capacity + 8) // 8) + 8 * (capacity + 1)
+
+
+@instrumented
+def dp_move_max_voters_approx(winner_states, ec_votes, epsilon = 0.1):
+    """
+    Approximate version of dp_move_max_voters for very large EC capacities.
+
+    Margins are divided by K = epsilon * max_margin / n and rounded down, and the
+    DP runs over the scaled margin instead of over EC capacity (the smallest EC
+    weight reaching each scaled margin), so time and memory are polynomial in n
+    and 1/epsilon and do not depend on ec_votes.
+
+    The choice bitmap has one bit per state and scaled margin, O(n^3 / epsilon)
+    bits; a ValueError is raised if it would exceed DP_MEMORY_BUDGET.
+
+    Parameters:
+    winner_states - a list of State instances that were won by the winner 
+    ec_votes - int, the maximum number of EC votes 
+    epsilon - float, relative error allowed (0 < epsilon < 1)
+
+    Returns:
+    A tuple (states, error_bound) where
+        - states is a list of State instances worth at most ec_votes EC votes
+        - error_bound is an int, their total margin is at most this many voters below
+          the optimum (and error_bound <= epsilon * optimum)
+    """
+    
+    if not 0 < epsilon < 1:
+        raise ValueError("epsilon must be between 0 and 1")
+    
+    if ec_votes <= 0:
+        return [], 0
+    
+    # Only states that fit on their own can ever be chosen
+    items = [i for i, state in enumerate(winner_states) if state.get_num_ecvotes() <= ec_votes]
+    if items == []:
+        return [], 0
+    
+    max_margin = max(winner_states[i].get_margin() for i in items)
+    scale = max(epsilon * max_margin / len(items), 1)
+    weights = [winner_states[i].get_num_ecvotes() for i in items]
+    values = [int(winner_states[i].get_margin() // scale) for i in items]
+    
+    # min_weight[p] is the smallest EC weight with scaled margin exactly p
+    top = sum(values)
+    if _knapsack_memory(len(items), top) > DP_MEMORY_BUDGET:
+        raise ValueError("approximate table for %d states and scaled margin %d exceeds DP_MEMORY_BUDGET, "
+                         "use a larger epsilon" % (len(items), top))
+    count("knapsack.table_cells", len(items) * (top + 1))
+    unreachable = ec_votes + 1
+    if len(items) * (top + 1) >= NUMPY_MIN_CELLS and unreachable + max(weights) < 2 ** 63 and _load_numpy_kernel():
+        min_weight, choice, stride = _numpy_kernel.min_weight_table(weights, values, top, unreachable)
     else:
+        stride = (top + 8) // 8
+        choice = bytearray(stride * len(items))
+        min_weight = [0] + [unreachable] * top
         
-        # Take the next state
-        nextItem = winner_states[0]
-        
-        # Explore left branch
-        withToTake = dp_move_max_voters(winner_states[1:], ec_votes - nextItem.get_num_ecvotes(), memo) + [nextItem]
-        
-        # Update withVal
-        withVal = 0
-        for state in withToTake:
-            withVal += state.get_margin()
-            
-        # Explore right branch        
-        withoutToTake = dp_move_max_voters(winner_states[1:], ec_votes, memo)
-        
-        # Update withoutVal
-        withoutVal = 0
-        for state in withoutToTake:
-            withoutVal +=  state.get_margin()
-        
-        # Choose better branch
-        if withVal > withoutVal:
-            result = withToTake
+        # Items backwards, scaled margin downwards (same rolling scheme as _knapsack_table)
+        for k in range(len(items) - 1, -1, -1):
+            weight = weights[k]
+            value = values[k]
+            row = k * stride
+            for p in range(top, value - 1, -1):
+                with_weight = min_weight[p - value] + weight
+                if with_weight < min_weight[p]:
+                    min_weight[p] = with_weight
+                    choice[row + (p >> 3)] |= 0x80 >> (p & 7)
+    
+    # Best reachable scaled margin within the EC limit
+    p = max(p for p in range(top + 1) if min_weight[p] <= ec_votes)
+    taken = []
+    for k in range(len(items)):
+        if choice[k * stride + (p >> 3)] & (0x80 >> (p & 7)):
+            taken.append(items[k])
+            p -= values[k]
+    taken.reverse()
+    
+    # Rounding loses less than one scaled unit per item
+    error_bound = int(len(items) * scale) if scale > 1 else 0
+    return [winner_states[i] for i in taken], error_bound
 
-        else:
-            result = withoutToTake
+
+@instrumented
+def dp_move_max_voters_bnb(winner_states, ec_votes, max_nodes = None):
+    """
+    Exact version of dp_move_max_voters that does not build a table over EC
+    capacity. Depth-first branch-and-bound over the states in decreasing
+    margin per EC vote, pruning with the fractional (LP relaxation) bound.
+    Runs iteratively, so there is no recursion limit.
+
+    Parameters:
+    winner_states - a list of State instances that were won by the winner 
+    ec_votes - int, the maximum number of EC votes 
+    max_nodes - OPTIONAL int, number of search nodes to expand before giving up
+
+    Returns:
+    A list of State instances with the same total margin as dp_move_max_voters
+    The empty list, if every state has a # EC votes greater than ec_votes
+    None, if the search needed more than max_nodes nodes
+    """
     
-    # Update memo
-    memo[(len(winner_states), ec_votes)] = result
-    return result
+    if ec_votes <= 0:
+        return []
+    
+    # States worth no EC votes are always worth taking
+    free = [i for i, state in enumerate(winner_states) if state.get_num_ecvotes() == 0]
+    items = [i for i, state in enumerate(winner_states) if 0 < state.get_num_ecvotes() <= ec_votes]
+    items.sort(key = lambda i: -winner_states[i].get_margin() / winner_states[i].get_num_ecvotes())
+    weights = [winner_states[i].get_num_ecvotes() for i in items]
+    values = [winner_states[i].get_margin() for i in items]
+    
+    # Prefix sums in ratio order for O(log n) fractional bounds
+    prefix_weight = [0]
+    prefix_value = [0]
+    for weight, value in zip(weights, values):
+        prefix_weight.append(prefix_weight[-1] + weight)
+        prefix_value.append(prefix_value[-1] + value)
+    
+    def upper_bound(k, capacity, value):
+        # Whole items k..j-1 fit, then a fraction of item j
+        j = bisect.bisect_right(prefix_weight, prefix_weight[k] + capacity, k) - 1
+        bound = value + prefix_value[j] - prefix_value[k]
+        if j < len(items):
+            bound += values[j] * (capacity - prefix_weight[j] + prefix_weight[k]) / weights[j]
+        return bound
+    
+    best_value = -1
+    best_chain = None
+    
+    # Nodes are (next item, capacity left, value so far, chosen items as (item, parent) links)
+    stack = [(0, ec_votes, 0, None)]
+    nodes = 0
+    while stack:
+        k, capacity, value, chain = stack.pop()
+        nodes += 1
+        if max_nodes is not None and nodes > max_nodes:
+            count("dp_move_max_voters_bnb.nodes", nodes)
+            return None
+        if k == len(items) or capacity == 0:
+            if value > best_value:
+                best_value, best_chain = value, chain
+            continue
+        if upper_bound(k, capacity, value) <= best_value:
+            continue
+        
+        # Push the exclude branch first so the include branch is explored first
+        stack.append((k + 1, capacity, value, chain))
+        if weights[k] <= capacity:
+            stack.append((k + 1, capacity - weights[k], value + values[k], (items[k], chain)))
+    
+    count("dp_move_max_voters_bnb.nodes", nodes)
+    taken = list(free)
+    while best_chain is not None:
+        taken.append(best_chain[0])
+        best_chain = best_chain[1]
+    return [winner_states[i] for i in sorted(taken, reverse = True)]
 
 
-def move_min_voters(winner_states, ec_votes_needed):
+@instrumented
+def move_min_voters(winner_states, ec_votes_needed, solver = "auto", epsilon = 0.1, with_error_bound = False):
     """
     Finds a subset of winner_states that would change an election outcome if
     voters moved into those states. Should minimize the number of voters being relocated. 
@@ -379,31 +734,368 @@ def move_min_voters(winner_states, ec_votes_needed):
     Parameters:
     winner_states - a list of State instances that were won by the winner 
     ec_votes_needed - int, number of EC votes needed to change the election outcome
+    solver - str, how the complementary knapsack is solved:
+             "dp" - dp_move_max_voters
+             "bnb" - dp_move_max_voters_bnb (exact, no table over EC capacity)
+             "sparse" - move_min_voters_sparse (exact, no table over EC capacity)
+             "approx" - dp_move_max_voters_approx with the given epsilon
+             "auto" - "dp", or when the DP table would exceed DP_MEMORY_BUDGET, "bnb"
+                      for up to BNB_NODE_BUDGET search nodes and then "sparse"
+    epsilon - float, relative error allowed by the "approx" solver
+    with_error_bound - bool, also return how far the answer may be from the optimum
 
     Returns:
     A list of State instances such that the election outcome would change if additional
     voters relocated to those states (also can be referred to as our swing states)
     The empty list, if no possible swing states
+    If with_error_bound is True, a tuple (swing_states, error_bound) instead, where
+    error_bound is an int, the total margin of swing_states is at most this many voters
+    above the minimum (always 0 except for the "approx" solver)
     """
     
     # Get total ec votes for winner states
     ec_votes_won_by_winner = 0
     for state in winner_states:
         ec_votes_won_by_winner += state.get_num_ecvotes()
+    capacity = ec_votes_won_by_winner - ec_votes_needed
+    
+    # All of winner_states together are not worth enough EC votes
+    if ec_votes_needed > ec_votes_won_by_winner:
+        return ([], 0) if with_error_bound else []
+    
+    # Only the automatic choice limits the branch-and-bound search
+    max_nodes = None
+    if solver == "auto":
+        if _knapsack_memory(len(winner_states), capacity) > DP_MEMORY_BUDGET:
+            solver = "bnb"
+            max_nodes = BNB_NODE_BUDGET
+        else:
+            solver = "dp"
     
     # Get non swing states for the winner candidate (these are states that winner MUST win)
-    nonSwing_states = dp_move_max_voters(winner_states, ec_votes_won_by_winner - ec_votes_needed, memo = None)
+    error_bound = 0
+    nonSwing_states = None
+    if solver == "dp":
+        nonSwing_states = dp_move_max_voters(winner_states, capacity)
+    elif solver == "bnb":
+        nonSwing_states = dp_move_max_voters_bnb(winner_states, capacity, max_nodes)
+    elif solver == "approx":
+        nonSwing_states, error_bound = dp_move_max_voters_approx(winner_states, capacity, epsilon)
+        count("move_min_voters.approx_error_bound", error_bound)
+    elif solver != "sparse":
+        raise ValueError("unknown solver: %r" % (solver,))
     
-    # Find and store swing states (states that are in winner states list but not in non swing states list are swing states)
-    swing_states = []
-    for state in winner_states:
-        if state not in nonSwing_states:
-            swing_states.append(state)
-     
+    # Sparse DP, also when branch-and-bound ran out of nodes (its cost does not depend on capacity)
+    if nonSwing_states is None:
+        if solver == "bnb":
+            count("move_min_voters.sparse_fallbacks")
+        swing_states = move_min_voters_sparse(winner_states, ec_votes_needed)[0]
+    else:
+        nonSwing_states = set(nonSwing_states)
+        
+        # Find and store swing states (states that are in winner states list but not in non swing states list are swing states)
+        swing_states = []
+        for state in winner_states:
+            if state not in nonSwing_states:
+                swing_states.append(state)
+    
+    if with_error_bound:
+        return swing_states, error_bound
     return swing_states
 
+
+@instrumented
+def move_min_voters_sparse(winner_states, ec_votes_needed):
+    """
+    Same problem as move_min_voters, solved with a sparse DP that keeps only
+    the Pareto-optimal (EC votes, total margin) pairs of each stage instead of
+    a row over every EC capacity. Each stage merges the current pairs with the
+    pairs shifted by one state, in EC vote order, and drops every pair that is
+    over capacity or dominated (no lighter pair with at least the same margin).
+    Time and memory follow the number of non-dominated pairs.
+
+    Parameters:
+    winner_states - a list of State instances that were won by the winner 
+    ec_votes_needed - int, number of EC votes needed to change the election outcome
+
+    Returns:
+    A tuple (swing_states, pruned) where
+        - swing_states is a list of State instances with the same total margin as
+          the result of move_min_voters (the empty list, if no possible swing states)
+        - pruned is an int, the number of candidate pairs discarded
+    """
+    
+    # All of winner_states together are not worth enough EC votes
+    total_ec = sum(state.get_num_ecvotes() for state in winner_states)
+    if total_ec < ec_votes_needed:
+        return [], 0
+    capacity = total_ec - ec_votes_needed
+    if capacity <= 0:
+        return list(winner_states), 0
+    
+    # Pairs are (ec votes, total margin, chosen states as (index, parent) links),
+    # sorted by ec votes with strictly increasing margin
+    front = [(0, 0, None)]
+    pruned = 0
+    for i in range(len(winner_states) - 1, -1, -1):
+        weight = winner_states[i].get_num_ecvotes()
+        value = winner_states[i].get_margin()
+        shifted = [(w + weight, v + value, (i, chain)) for w, v, chain in front if w + weight <= capacity]
+        pruned += len(front) - len(shifted)
+        
+        # Merge by ec votes; on equal ec votes the old pair (state not taken) goes first
+        merged = []
+        a = b = 0
+        while a < len(front) or b < len(shifted):
+            if b == len(shifted) or (a < len(front) and front[a][0] <= shifted[b][0]):
+                candidate = front[a]
+                a += 1
+            else:
+                candidate = shifted[b]
+                b += 1
+            
+            # Keep only pairs with a strictly larger margin than every lighter pair
+            if merged != [] and candidate[1] <= merged[-1][1]:
+                pruned += 1
+            elif merged != [] and candidate[0] == merged[-1][0]:
+                pruned += 1
+                merged[-1] = candidate
+            else:
+                merged.append(candidate)
+        front = merged
+    count("move_min_voters_sparse.pruned", pruned)
+    
+    # The heaviest pair left has the largest margin; its states are kept by the winner
+    kept = set()
+    chain = front[-1][2]
+    while chain is not None:
+        kept.add(chain[0])
+        chain = chain[1]
+    
+    return [state for i, state in enumerate(winner_states) if i not in kept], pruned
+
+
+class SwingFrontier():
+    """
+    The minimum-relocation swing states for every EC target, computed from a
+    single knapsack table over the full EC capacity of winner_states.
+
+    Costs for all targets are available immediately; the matching state sets
+    are only reconstructed (and then cached) for the targets that are asked for.
+    """
+    def __init__(self, winner_states):
+        """
+        Parameters:
+        winner_states - a list of State instances that were won by the winner 
+
+        Attributes:
+        self.winner_states - list of State instances the frontier was built from
+        self.total_ec - int, total number of EC votes in winner_states
+        self.costs - list of ints, self.costs[k] is the minimum total margin of a set of
+                     states worth at least k EC votes, for k from 0 to self.total_ec
+        """
+        
+        self.winner_states = list(winner_states)
+        self._weights = [state.get_num_ecvotes() for state in self.winner_states]
+        values = [state.get_margin() for state in self.winner_states]
+        self.total_ec = sum(self._weights)
+        total_margin = sum(values)
+        
+        # One table over the whole capacity answers every target at once
+        best, self._choice, self._stride = _knapsack_table(self._weights, values, self.total_ec)
+        
+        # Swing states are the complement of the states kept with at most total - k EC votes
+        self.costs = [total_margin - best[self.total_ec - k] if k < self.total_ec else total_margin
+                      for k in range(self.total_ec + 1)]
+        self._swing_states = {}
+
+    def min_voters(self, ec_votes_needed):
+        """
+        Parameters:
+        ec_votes_needed - int, number of EC votes needed to change the election outcome
+
+        Returns:
+        int, the total margin of the cheapest swing states (the quantity move_min_voters minimizes)
+        None, if winner_states do not hold enough EC votes
+        """
+        
+        if ec_votes_needed > self.total_ec:
+            return None
+        return self.costs[max(ec_votes_needed, 0)]
+
+    def swing_states(self, ec_votes_needed):
+        """
+        Parameters:
+        ec_votes_needed - int, number of EC votes needed to change the election outcome
+
+        Returns:
+        A list of State instances, the same states move_min_voters would return
+        The empty list, if winner_states do not hold enough EC votes
+        """
+        
+        if ec_votes_needed > self.total_ec:
+            return []
+        ec_votes_needed = max(ec_votes_needed, 0)
+        
+        # Reconstruct lazily, only for targets that are actually requested
+        if ec_votes_needed not in self._swing_states:
+            capacity = self.total_ec - ec_votes_needed
+            kept = set()
+            if capacity > 0:
+                kept = set(_knapsack_backtrack(self._weights, self._choice, self._stride, capacity))
+            self._swing_states[ec_votes_needed] = [state for i, state in enumerate(self.winner_states)
+                                                   if i not in kept]
+        return self._swing_states[ec_votes_needed]
+
+
+@instrumented
+def swing_frontier(winner_states):
+    """
+    Finds the minimum number of voters that need to be relocated, and the states
+    to relocate them to, for every EC target from 1 to the total EC votes of 
+    winner_states, with a single knapsack table build.
+
+    Parameters:
+    winner_states - a list of State instances that were won by the winner 
+
+    Returns:
+    A SwingFrontier; frontier.min_voters(k) and frontier.swing_states(k) give the
+    result of move_min_voters(winner_states, k) for any target k
+    """
+    
+    return SwingFrontier(winner_states)
+
+
+def _knapsack_rows(weights, values, capacity):
+    """
+    Builds the knapsack value rows for every prefix of the items.
+
+    Parameters:
+    weights - a list of ints, the weight (#ec_votes) of each item
+    values - a list of ints, the value (#margin) of each item
+    capacity - int, the largest total weight to consider
+
+    Returns:
+    A list of n + 1 rows; rows[i][c] is the largest value of items 0..i-1 with total weight <= c
+    """
+    
+    rows = [[0] * (capacity + 1)]
+    for weight, value in zip(weights, values):
+        prev = rows[-1]
+        row = prev[:]
+        for c in range(weight, capacity + 1):
+            if prev[c - weight] + value > row[c]:
+                row[c] = prev[c - weight] + value
+        rows.append(row)
+    return rows
+
+
+def _leave_one_out_kept(weights, values, capacity, remaining):
+    """
+    Finds, for every item i, the largest value of all the other items with total
+    weight <= remaining[i]. Only the forward (prefix) rows are stored; the row
+    for the items after i is rolled backwards while i goes from n-1 to 0.
+    Uses the NumPy kernel in knapsack_numpy for large tables when available.
+
+    Parameters:
+    weights - a list of ints, the weight (#ec_votes) of each item
+    values - a list of ints, the value (#margin) of each item
+    capacity - int, the largest total weight to consider (>= every remaining[i])
+    remaining - a list of ints, the capacity left for the other items (negative if none)
+
+    Returns:
+    A tuple (kept, best) where
+        - kept is a list, kept[i] is the largest value without item i (None if remaining[i] < 0)
+        - best is an int, the largest value of all items with total weight <= capacity
+    """
+    
+    if len(weights) * (capacity + 1) >= NUMPY_MIN_CELLS and sum(values) < 2 ** 63 and _load_numpy_kernel():
+        return _numpy_kernel.leave_one_out_kept(weights, values, capacity, remaining)
+    
+    forward = _knapsack_rows(weights, values, capacity)
+    after = [0] * (capacity + 1)
+    kept = [None] * len(weights)
+    for i in range(len(weights) - 1, -1, -1):
+        
+        # Best split of the remaining capacity between the items before and after i
+        if remaining[i] >= 0:
+            before = forward[i]
+            kept[i] = max(before[a] + after[remaining[i] - a] for a in range(remaining[i] + 1))
+        
+        # Add item i to the rolling row of the items after it
+        weight = weights[i]
+        value = values[i]
+        for c in range(capacity, weight - 1, -1):
+            if after[c - weight] + value > after[c]:
+                after[c] = after[c - weight] + value
+    
+    return kept, after[capacity]
+
+
+@instrumented
+def swing_sensitivity(winner_states, ec_votes_needed):
+    """
+    Finds, for every state in winner_states, the minimum relocation cost of
+    move_min_voters if that state were taken out of play (e.g. because of a 
+    recount), i.e. could not be used as a swing state.
+
+    Forward tables (states before i) are built once and the table for the
+    states after i is rolled backwards; each leave-one-out answer combines the
+    two rows around state i, so all n answers cost O(n * EC votes) in total
+    instead of n solver runs. If the forward tables would exceed
+    DP_MEMORY_BUDGET, move_min_voters is run once per state instead.
+
+    Parameters:
+    winner_states - a list of State instances that were won by the winner 
+    ec_votes_needed - int, number of EC votes needed to change the election outcome
+
+    Returns:
+    A tuple (baseline, results) where
+        - baseline is an int, the total margin of the move_min_voters swing states
+          (None if winner_states do not hold enough EC votes)
+        - results is a list with one tuple (state, cost, change) per state, in order:
+          cost is the minimum total margin without that state and change is 
+          cost - baseline (both None if the election can no longer be swung)
+    """
+    
+    weights = [state.get_num_ecvotes() for state in winner_states]
+    values = [state.get_margin() for state in winner_states]
+    total_ec = sum(weights)
+    total_margin = sum(values)
+    capacity = max(total_ec - ec_votes_needed, 0)
+    
+    if ec_votes_needed > total_ec:
+        return None, [(state, None, None) for state in winner_states]
+    
+    # Without state i its EC votes stay with the winner, the rest must cover the target
+    remaining = [total_ec - weight - ec_votes_needed for weight in weights]
+    
+    if 8 * (len(weights) + 1) * (capacity + 1) > DP_MEMORY_BUDGET:
+        
+        # Too large for the tables: one solver run (dp or branch-and-bound) per state
+        baseline = sum(state.get_margin() for state in move_min_voters(winner_states, ec_votes_needed))
+        costs = [sum(state.get_margin() for state in
+                     move_min_voters(winner_states[:i] + winner_states[i + 1:], ec_votes_needed))
+                 if remaining[i] >= 0 else None for i in range(len(winner_states))]
+    else:
+        kept, best = _leave_one_out_kept(weights, values, capacity, remaining)
+        baseline = total_margin - best
+        costs = [total_margin - values[i] - kept[i] if kept[i] is not None else None
+                 for i in range(len(winner_states))]
+    
+    results = []
+    for state, cost in zip(winner_states, costs):
+        if cost is None:
+            results.append((state, None, None))
+        else:
+            results.append((state, cost, cost - baseline))
+    
+    return baseline, results
+
+
 #Problem 6
-def flip_election(election, swing_states):
+@instrumented
+def flip_election(election, swing_states, mode = "order", distance = None, total = 538):
     """
     Finds a way to shuffle voters in order to flip an election outcome. 
     Moves voters from states that were won by the losing candidate (any state not in winner_states), 
@@ -414,10 +1106,19 @@ def flip_election(election, swing_states):
     Also finds the number of EC votes gained by this rearrangement, as well as the minimum number of 
     voters that need to be moved.
 
+    Swing states are flipped in the given order until enough EC votes are gained. Neither
+    election nor swing_states is modified.
+
     Parameters:
     election - a list of State instances representing the election 
     swing_states - a list of State instances where people need to move to flip the election outcome 
                    (result of move_min_voters or greedy_election)
+    mode - str, how donor voters are assigned to swing states:
+           "order" - donors in election order fill swing states in order (linear time)
+           "min_moves" - use few distinct (from_state, to_state) pairs
+           "min_cost" - minimize the total distance(from_state, to_state) per voter moved
+    distance - function (from_name, to_name) -> non-negative number, required for "min_cost"
+    total - total possible number of EC votes
     
     Return:
     A tuple that has 3 elements in the following order:
@@ -429,89 +1130,59 @@ def flip_election(election, swing_states):
     None, if it is not possible to sway the election
     """
    
-    # Get lost states by losing candidate
-    lost_states_list = winner_states(election)
+    # Tally once for both the winner and the EC votes required
+    dem_ec, gop_ec = _ec_totals(election)
+    if dem_ec > gop_ec:
+        winner, ec_reqd = "dem", (total // 2 + 1) - gop_ec
+    else:
+        winner, ec_reqd = "gop", (total // 2 + 1) - dem_ec
     
     # Find won states by losing candidate (these states will donate voters to swing states)
+    # Each can give up all but one of its margin and still be won by the loser
     donor_states_list = []
     donor_state_margins = []
     for state in election:
-        if state not in lost_states_list:
+        if state.get_winner() != winner and state.get_margin() > 1:
             donor_states_list.append(state)
             donor_state_margins.append(state.get_margin() - 1)
     
-    # Initialize values
-    from_to_dict = {}
+    # Take swing states in order until they are worth enough EC votes
     ec_votes_gained = 0
-    voters_moved = 0
-    ec_reqd = ec_votes_reqd(election)
+    flipped_states = []
+    for state in swing_states:
+        if ec_votes_gained >= ec_reqd:
+            break
+        flipped_states.append(state)
+        ec_votes_gained += state.get_num_ecvotes()
     
+    # In case election cannot be flipped (not enough swing states)
+    if ec_votes_gained < ec_reqd:
+        return None
     
-    # Iterate through loser states (states you need to move out of)
-    # As long as there are donor states left and there is need to collect more ec votes
-    while ec_votes_gained < ec_reqd and donor_states_list != []:
-        
-        # Get first swing state
-        first_swing_state = swing_states[0] 
-        
-        # Get swing state's margin (+1 ensures state is flipped)
-        flip_margin = first_swing_state.get_margin() + 1
-        
-        # As long as swing state needs voters and there are donor states left
-        while flip_margin != 0 and donor_states_list != []:
-            
-            # Get first donor state
-            donor_state = donor_states_list[0]
-
-            # Donor state has less than needed
-            if donor_state_margins[0] < flip_margin:
-                
-                # Update dictionary, number of voters moved, and flip margin
-                from_to_dict[(donor_state.get_name(), first_swing_state.get_name())] = donor_state_margins[0]
-                voters_moved += donor_state_margins[0] 
-                flip_margin -= donor_state_margins[0]
-                
-                # Remove donor state and its margin from both lists
-                donor_states_list.remove(donor_state)
-                donor_state_margins.remove(donor_state_margins[0])
-                
-            # Donor state has more than needed
-            elif donor_state_margins[0] > flip_margin:
-                
-                # Update dictionary
-                from_to_dict[(donor_state.get_name(), first_swing_state.get_name())] = flip_margin
-                
-                # Fully flipping the swing state
-                ec_votes_gained += first_swing_state.get_num_ecvotes()
-                voters_moved += flip_margin
-                
-                # Update donor margin and remove donor state 
-                donor_state_margins[0] -= flip_margin
-                swing_states.remove(first_swing_state)
-
-                flip_margin = 0
-            
-            # Donor state has what's neede exactly
-            else:
-                # Update dictionary
-                from_to_dict[(donor_state.get_name(), first_swing_state.get_name())] = flip_margin
-                
-                # Fully flipping the swing state
-                ec_votes_gained += first_swing_state.get_num_ecvotes()
-                voters_moved += flip_margin
-                
-                # Remove donor state, its margin, and the swing state
-                donor_state_margins.remove(donor_state_margins[0])
-                donor_states_list.remove(donor_state)
-                swing_states.remove(first_swing_state)
-
-                flip_margin = 0
+    # Swing state's margin (+1 ensures state is flipped)
+    flip_margins = [state.get_margin() + 1 for state in flipped_states]
+    
+    if mode == "order":
+        moves = allocation.allocate_in_order(donor_state_margins, flip_margins)
+    elif mode == "min_moves":
+        moves = allocation.allocate_min_moves(donor_state_margins, flip_margins)
+    elif mode == "min_cost":
+        if distance is None:
+            raise ValueError("mode 'min_cost' requires a distance function")
+        moves = allocation.allocate_min_cost(donor_state_margins, flip_margins,
+            lambda i, j: distance(donor_states_list[i].get_name(), flipped_states[j].get_name()))
+    else:
+        raise ValueError("unknown mode: %r" % (mode,))
     
-    # In case election cannot be flipped (flip margin is too large)           
-    if  ec_votes_gained < ec_reqd:
+    # In case election cannot be flipped (flip margin is too large)
+    if moves is None:
         return None
+    
+    from_to_dict = {}
+    for (i, j), voters in moves.items():
+        from_to_dict[(donor_states_list[i].get_name(), flipped_states[j].get_name())] = voters
                 
-    return (from_to_dict, ec_votes_gained, voters_moved)
+    return (from_to_dict, ec_votes_gained, sum(flip_margins))
                 
 
 
@@ -0,0 +1,106 @@
+import numpy as np
+
+
+def _error_transform(sigma, correlation, num_states):
+    """
+    Builds the matrix that turns independent standard normal draws into
+    polling errors with the requested per-state sigma and correlation.
+
+    Parameters:
+    sigma - float or sequence of floats, standard deviation of each state's vote margin error
+    correlation - None, or a (states x states) correlation matrix
+    num_states - int, number of states in the election
+
+    Returns:
+    A (states x states) array L such that z @ L has the requested covariance,
+    or a (states,) array of sigmas when the errors are independent
+    """
+
+    sigma = np.broadcast_to(np.asarray(sigma, dtype=np.float64), (num_states,))
+    if np.any(sigma < 0):
+        raise ValueError("sigma must be non-negative")
+    if correlation is None:
+        return sigma
+
+    correlation = np.asarray(correlation, dtype=np.float64)
+    if correlation.shape != (num_states, num_states):
+        raise ValueError("correlation must be a (states x states) matrix")
+
+    # Covariance = diag(sigma) C diag(sigma) = (L diag(sigma))^T (L diag(sigma))
+    return np.linalg.cholesky(correlation).T * sigma
+
+
+def simulate_election(election, sigma, correlation=None, trials=100000, chunk_size=100000, seed=None):
+    """
+    Estimates how likely each outcome of find_winner is when every state's vote
+    margin (dem - gop) carries a normally distributed polling error.
+
+    Scenarios are drawn as a (trials x states) array in chunks of at most
+    chunk_size rows, so memory stays bounded however many trials are run.
+
+    Parameters:
+    election - a list of State instances (e.g. the output of load_election_results)
+    sigma - float or sequence of floats, standard deviation of each state's margin error, in votes
+    correlation - OPTIONAL (states x states) correlation matrix between the state errors
+    trials - int, number of scenarios to draw
+    chunk_size - int, maximum number of scenarios held in memory at once
+    seed - OPTIONAL seed for the random number generator
+
+    Returns:
+    A dictionary with the following (key, value) mapping:
+        - "trials": int, number of scenarios drawn
+        - "win_probability": dict, {"dem": float, "gop": float}
+        - "ec_distribution": float array, entry k is the probability that dem wins k EC votes
+        - "tipping_point": dict, state name -> fraction of scenarios in which it was the tipping point
+    """
+
+    if trials <= 0 or chunk_size <= 0:
+        raise ValueError("trials and chunk_size must be positive")
+
+    names = [state.get_name() for state in election]
+    margin = np.array([state.dem - state.gop for state in election], dtype=np.float64)
+    ec = np.array([state.get_num_ecvotes() for state in election], dtype=np.int64)
+    total_ec = int(ec.sum())
+    transform = _error_transform(sigma, correlation, len(election))
+    rng = np.random.default_rng(seed)
+
+    dem_wins = 0
+    ec_counts = np.zeros(total_ec + 1, dtype=np.int64)
+    tipping_counts = np.zeros(len(election), dtype=np.int64)
+
+    done = 0
+    while done < trials:
+        size = min(chunk_size, trials - done)
+        done += size
+
+        # Draw the perturbed margins for this chunk of scenarios
+        z = rng.standard_normal((size, len(election)))
+        if transform.ndim == 1:
+            scenario = margin + z * transform
+        else:
+            scenario = margin + z @ transform
+
+        # Same rules as State and find_winner: ties go to gop
+        dem_state = scenario > 0
+        dem_ec = dem_state.astype(np.int64) @ ec
+        dem_winner = dem_ec * 2 > total_ec
+        dem_wins += int(dem_winner.sum())
+        ec_counts += np.bincount(dem_ec, minlength=total_ec + 1)
+
+        # Tipping point: order states by margin in the winner's favour and find
+        # the state whose EC votes first carry the winner past the threshold
+        favour = np.where(dem_winner[:, None], scenario, -scenario)
+        order = np.argsort(-favour, axis=1, kind="stable")
+        cumulative = np.cumsum(ec[order], axis=1) * 2
+        threshold = total_ec + dem_winner.astype(np.int64)
+        tipping_index = np.argmax(cumulative >= threshold[:, None], axis=1)
+        tipping_state = order[np.arange(size), tipping_index]
+        tipping_counts += np.bincount(tipping_state, minlength=len(election))
+
+    return {
+        "trials": trials,
+        "win_probability": {"dem": dem_wins / trials, "gop": 1 - dem_wins / trials},
+        "ec_distribution": ec_counts / trials,
+        "tipping_point": {name: count / trials
+                          for name, count in zip(names, tipping_counts.tolist()) if count},
+    }